@@ -0,0 +1,46 @@
+"""De-duplicate session participants and cache their count on the session
+
+Revision ID: 0d6c4f8e2b19
+Revises: 7f3b2e6a1c08
+Create Date: 2026-10-18 13:11:27.640193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d6c4f8e2b19'
+down_revision = '7f3b2e6a1c08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_game_session used to insert a participant on every fetch; keep the
+    # earliest row per player, active if any of their rows was
+    op.execute(
+        'UPDATE session_participants SET is_active = TRUE WHERE id IN ('
+        'SELECT MIN(id) FROM session_participants GROUP BY session_id, user_id '
+        'HAVING MAX(CASE WHEN is_active THEN 1 ELSE 0 END) = 1)'
+    )
+    op.execute(
+        'DELETE FROM session_participants WHERE id NOT IN ('
+        'SELECT MIN(id) FROM session_participants GROUP BY session_id, user_id)'
+    )
+    op.drop_index('ix_session_participants_session_user_active', table_name='session_participants')
+    op.create_index('uq_session_participants_session_user', 'session_participants', ['session_id', 'user_id'], unique=True)
+
+    op.add_column('game_sessions', sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE game_sessions SET participant_count = ('
+        'SELECT COUNT(*) FROM session_participants '
+        'WHERE session_participants.session_id = game_sessions.id AND session_participants.is_active)'
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('game_sessions') as batch_op:
+        batch_op.drop_column('participant_count')
+    op.drop_index('uq_session_participants_session_user', table_name='session_participants')
+    op.create_index('ix_session_participants_session_user_active', 'session_participants', ['session_id', 'user_id', 'is_active'], unique=False)
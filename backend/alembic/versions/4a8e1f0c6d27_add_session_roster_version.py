@@ -0,0 +1,46 @@
+"""Version session rosters so clients can fetch only what changed
+
+Revision ID: 4a8e1f0c6d27
+Revises: 0d6c4f8e2b19
+Create Date: 2026-10-18 15:02:44.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8e1f0c6d27'
+down_revision = '0d6c4f8e2b19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('game_sessions', sa.Column('roster_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('session_participants', sa.Column('roster_version', sa.Integer(), server_default='0', nullable=False))
+
+    # Number existing participants in join order, one version per player
+    op.execute(
+        'UPDATE session_participants SET roster_version = ('
+        'SELECT COUNT(*) FROM session_participants AS earlier '
+        'WHERE earlier.session_id = session_participants.session_id '
+        'AND earlier.id <= session_participants.id)'
+    )
+    op.execute(
+        'UPDATE game_sessions SET roster_version = ('
+        'SELECT COUNT(*) FROM session_participants '
+        'WHERE session_participants.session_id = game_sessions.id)'
+    )
+    op.create_index(
+        'ix_session_participants_session_roster_version', 'session_participants',
+        ['session_id', 'roster_version'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_participants_session_roster_version', table_name='session_participants')
+    with op.batch_alter_table('session_participants') as batch_op:
+        batch_op.drop_column('roster_version')
+    with op.batch_alter_table('game_sessions') as batch_op:
+        batch_op.drop_column('roster_version')
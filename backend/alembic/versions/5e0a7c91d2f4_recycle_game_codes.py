@@ -0,0 +1,34 @@
+"""Only require game codes to be unique among unfinished sessions
+
+Revision ID: 5e0a7c91d2f4
+Revises: b13f35514e82
+Create Date: 2026-10-18 11:20:05.213874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0a7c91d2f4'
+down_revision = 'b13f35514e82'
+branch_labels = None
+depends_on = None
+
+LIVE_SESSION = sa.text("status != 'FINISHED'")
+
+
+def upgrade() -> None:
+    op.drop_index('ix_game_sessions_game_code', table_name='game_sessions')
+    op.create_index('ix_game_sessions_game_code', 'game_sessions', ['game_code'], unique=False)
+    op.create_index(
+        'uq_game_sessions_live_game_code', 'game_sessions', ['game_code'], unique=True,
+        sqlite_where=LIVE_SESSION, postgresql_where=LIVE_SESSION
+    )
+
+
+def downgrade() -> None:
+    # Fails if a code has been recycled since the upgrade
+    op.drop_index('uq_game_sessions_live_game_code', table_name='game_sessions')
+    op.drop_index('ix_game_sessions_game_code', table_name='game_sessions')
+    op.create_index('ix_game_sessions_game_code', 'game_sessions', ['game_code'], unique=True)
@@ -0,0 +1,26 @@
+"""Store answer times as fractional seconds
+
+Revision ID: 7f3b2e6a1c08
+Revises: 5e0a7c91d2f4
+Create Date: 2026-10-18 12:02:41.558310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3b2e6a1c08'
+down_revision = '5e0a7c91d2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('player_answers') as batch_op:
+        batch_op.alter_column('answer_time', existing_type=sa.Integer(), type_=sa.Float(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('player_answers') as batch_op:
+        batch_op.alter_column('answer_time', existing_type=sa.Float(), type_=sa.Integer(), existing_nullable=True)
@@ -0,0 +1,57 @@
+"""Add session participants and timing columns missing from the initial migration
+
+These were previously only created by Base.metadata.create_all and
+migrate_game_sessions.py, so every step checks what already exists.
+
+Revision ID: 9c116e8ad3b4
+Revises: a3d5c0894851
+Create Date: 2026-10-18 10:01:12.553190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c116e8ad3b4'
+down_revision = 'a3d5c0894851'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    session_columns = [column['name'] for column in inspector.get_columns('game_sessions')]
+    if 'question_time_limit' not in session_columns:
+        op.add_column('game_sessions', sa.Column('question_time_limit', sa.Integer(), nullable=True))
+    if 'current_question_started_at' not in session_columns:
+        op.add_column('game_sessions', sa.Column('current_question_started_at', sa.DateTime(timezone=True), nullable=True))
+
+    answer_columns = [column['name'] for column in inspector.get_columns('player_answers')]
+    if 'answer_time' not in answer_columns:
+        op.add_column('player_answers', sa.Column('answer_time', sa.Integer(), nullable=True))
+
+    if 'session_participants' not in tables:
+        op.create_table('session_participants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['game_sessions.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_session_participants_id'), 'session_participants', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_session_participants_id'), table_name='session_participants')
+    op.drop_table('session_participants')
+    with op.batch_alter_table('player_answers') as batch_op:
+        batch_op.drop_column('answer_time')
+    with op.batch_alter_table('game_sessions') as batch_op:
+        batch_op.drop_column('current_question_started_at')
+        batch_op.drop_column('question_time_limit')
@@ -0,0 +1,30 @@
+"""Add denormalized question count to quizzes
+
+Revision ID: a3d5c0894851
+Revises: c2d14ad33d4a
+Create Date: 2026-10-18 09:12:31.418277
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5c0894851'
+down_revision = 'c2d14ad33d4a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('quizzes', sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill counts for existing quizzes
+    op.execute(
+        'UPDATE quizzes SET question_count = '
+        '(SELECT COUNT(*) FROM questions WHERE questions.quiz_id = quizzes.id)'
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_column('question_count')
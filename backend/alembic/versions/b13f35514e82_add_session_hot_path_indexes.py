@@ -0,0 +1,39 @@
+"""Add composite indexes for session hot queries
+
+Revision ID: b13f35514e82
+Revises: 9c116e8ad3b4
+Create Date: 2026-10-18 10:03:47.906512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b13f35514e82'
+down_revision = '9c116e8ad3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the first answer of any duplicates so the unique index can be built
+    op.execute(
+        'DELETE FROM player_answers WHERE id NOT IN ('
+        'SELECT MIN(id) FROM player_answers GROUP BY session_id, player_id, question_id)'
+    )
+    op.create_index('uq_player_answers_session_player_question', 'player_answers', ['session_id', 'player_id', 'question_id'], unique=True)
+    op.create_index('ix_session_participants_session_user_active', 'session_participants', ['session_id', 'user_id', 'is_active'], unique=False)
+    op.create_index('ix_questions_quiz_id_order', 'questions', ['quiz_id', 'order'], unique=False)
+    op.create_index('ix_options_question_id', 'options', ['question_id'], unique=False)
+    op.create_index('ix_quizzes_creator_id_is_active_created_at', 'quizzes', ['creator_id', 'is_active', 'created_at', 'id'], unique=False)
+    op.create_index('ix_quizzes_is_active_created_at_id', 'quizzes', ['is_active', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quizzes_is_active_created_at_id', table_name='quizzes')
+    op.drop_index('ix_quizzes_creator_id_is_active_created_at', table_name='quizzes')
+    op.drop_index('ix_options_question_id', table_name='options')
+    op.drop_index('ix_questions_quiz_id_order', table_name='questions')
+    op.drop_index('ix_session_participants_session_user_active', table_name='session_participants')
+    op.drop_index('uq_player_answers_session_player_question', table_name='player_answers')
@@ -1,26 +1,26 @@
-from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, User as UserSchema, Token
 from app.auth.auth import (
     authenticate_user,
-    create_access_token,
-    get_password_hash,
+    create_user_token,
+    hash_password,
     get_current_user
 )
-from app.core.config import settings
 
 router = APIRouter()
 
 @router.post("/signup", response_model=Token)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    existing_user = db.query(User).filter(
+    result = await db.execute(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))
+    existing_user = result.scalars().first()
     
     if existing_user:
         if existing_user.email == user_data.email:
@@ -35,7 +35,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -43,22 +43,19 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": db_user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(db_user)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return access token."""
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -66,10 +63,7 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
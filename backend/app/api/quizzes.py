@@ -1,135 +1,275 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.database import get_db
+import base64
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.sql import Select
+from app.core.config import settings
+from app.db.database import get_db, get_read_db
 from app.models.user import User
 from app.models.quiz import Quiz, Question, Option
-from app.schemas.quiz import QuizCreate, Quiz as QuizSchema, QuizSummary
+from app.schemas.quiz import (
+    QuizCreate,
+    Quiz as QuizSchema,
+    PlayerQuiz,
+    QuizSummary,
+    QuizImportError,
+    QuizImportResult
+)
 from app.auth.auth import get_current_user
+from app.services.quiz_cache import quiz_cache
 
 router = APIRouter()
 
+# Load questions and their options in one query per level instead of one per question
+FULL_QUIZ_OPTIONS = selectinload(Quiz.questions).selectinload(Question.options)
+
+
+async def insert_returning_ids(db: AsyncSession, model, rows: List[dict]) -> List[int]:
+    """Insert rows with one executemany INSERT and return their ids in the order of ``rows``."""
+    if db.bind.dialect.name == "sqlite":
+        # SQLAlchemy has no sentinel to match RETURNING rows to parameters on
+        # SQLite and would fall back to one INSERT per row. SQLite hands out
+        # rowids in VALUES order within a statement, so sorting them matches.
+        return sorted(await db.scalars(insert(model).returning(model.id), rows))
+    return list(await db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+
+
+async def insert_quizzes(db: AsyncSession, quizzes: List[QuizCreate], creator_id: int) -> List[int]:
+    """Insert quizzes with their questions and options, returning the new quiz ids.
+
+    Each table gets one executemany INSERT, which SQLAlchemy sends as
+    multi-row INSERT ... RETURNING statements, and the returned ids link the
+    rows of the next table to their parents. That is three statements however
+    many questions and options there are, instead of the ORM's one INSERT per
+    row.
+    """
+    quiz_ids = await insert_returning_ids(db, Quiz, [
+        {
+            "title": quiz_data.title,
+            "description": quiz_data.description,
+            "creator_id": creator_id,
+            "question_count": len(quiz_data.questions)
+        }
+        for quiz_data in quizzes
+    ])
+
+    question_rows = []
+    question_options = []
+    for quiz_id, quiz_data in zip(quiz_ids, quizzes):
+        for question_data in quiz_data.questions:
+            question_rows.append({"quiz_id": quiz_id, "text": question_data.text, "order": question_data.order})
+            question_options.append(question_data.options)
+    if not question_rows:
+        return quiz_ids
+
+    question_ids = await insert_returning_ids(db, Question, question_rows)
+
+    option_rows = [
+        {
+            "question_id": question_id,
+            "text": option_data.text,
+            "is_correct": option_data.is_correct,
+            "order": option_data.order
+        }
+        for question_id, options in zip(question_ids, question_options)
+        for option_data in options
+    ]
+    if option_rows:
+        await db.execute(insert(Option), option_rows)
+
+    return quiz_ids
+
 
 @router.post("/", response_model=QuizSchema)
 async def create_quiz(
     quiz_data: QuizCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new quiz."""
-    # Create quiz
-    db_quiz = Quiz(
-        title=quiz_data.title,
-        description=quiz_data.description,
-        creator_id=current_user.id
-    )
-    db.add(db_quiz)
-    db.commit()
-    db.refresh(db_quiz)
-    
-    # Create questions and options
-    for question_data in quiz_data.questions:
-        db_question = Question(
-            quiz_id=db_quiz.id,
-            text=question_data.text,
-            order=question_data.order
+    # Questions and options are inserted with the quiz in a single transaction
+    quiz_ids = await insert_quizzes(db, [quiz_data], current_user.id)
+    await db.commit()
+
+    result = await db.execute(select(Quiz).options(FULL_QUIZ_OPTIONS).where(Quiz.id == quiz_ids[0]))
+    return result.scalars().first()
+
+
+@router.post("/import", response_model=QuizImportResult)
+async def import_quizzes(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk import quizzes from a JSON Lines body (one QuizCreate object per line).
+
+    The body is parsed as it streams in and quizzes are committed in batches of
+    ``quiz_import_batch_size``. Lines that fail validation are reported and
+    skipped without aborting the import.
+    """
+    imported = 0
+    errors: List[QuizImportError] = []
+    batch: List[QuizCreate] = []
+
+    async def commit_batch():
+        nonlocal imported
+        if batch:
+            await insert_quizzes(db, batch, current_user.id)
+            await db.commit()
+            imported += len(batch)
+            batch.clear()
+
+    async def import_line(line_number: int, line: bytes):
+        if not line.strip():
+            return
+        try:
+            quiz_data = QuizCreate.model_validate_json(line)
+        except ValidationError as exc:
+            errors.append(QuizImportError(line=line_number, detail=str(exc)))
+            return
+        batch.append(quiz_data)
+        if len(batch) >= settings.quiz_import_batch_size:
+            await commit_batch()
+
+    line_number = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            await import_line(line_number, line)
+
+    if buffer:
+        await import_line(line_number + 1, buffer)
+    await commit_batch()
+
+    return QuizImportResult(imported=imported, errors=errors)
+
+
+def encode_cursor(quiz: Quiz) -> str:
+    """Encode the keyset position of a quiz as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(quiz.id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor into the id of the last quiz seen."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
-        db.add(db_question)
-        db.commit()
-        db.refresh(db_question)
-        
-        # Create options
-        for option_data in question_data.options:
-            db_option = Option(
-                question_id=db_question.id,
-                text=option_data.text,
-                is_correct=option_data.is_correct,
-                order=option_data.order
-            )
-            db.add(db_option)
-        
-        db.commit()
-    
-    # Refresh quiz to get all relationships
-    db.refresh(db_quiz)
-    return db_quiz
+
+
+async def list_quizzes(
+    db: AsyncSession,
+    query: Select,
+    response: Response,
+    limit: int,
+    cursor: Optional[str],
+    search: Optional[str]
+) -> List[QuizSummary]:
+    """Return one page of quizzes, newest first, paginated by (created_at, id).
+
+    When more quizzes follow, the cursor of the next page is returned in the
+    X-Next-Cursor response header.
+    """
+    if search:
+        query = query.where(Quiz.title.icontains(search, autoescape=True))
+
+    if cursor:
+        quiz_id = decode_cursor(cursor)
+        # Compare against the stored created_at of the last quiz seen rather
+        # than a value round-tripped through the cursor, so the comparison is
+        # exact whatever timestamp format the database uses.
+        last_seen = aliased(Quiz)
+        created_at = select(last_seen.created_at).where(last_seen.id == quiz_id).scalar_subquery()
+        query = query.where(or_(
+            Quiz.created_at < created_at,
+            and_(Quiz.created_at == created_at, Quiz.id < quiz_id)
+        ))
+
+    # Fetch one extra row to know whether there is a next page
+    result = await db.execute(query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1))
+    quizzes = result.scalars().all()
+
+    if len(quizzes) > limit:
+        quizzes = quizzes[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(quizzes[-1])
+
+    return [QuizSummary.model_validate(quiz) for quiz in quizzes]
 
 
 @router.get("/mine", response_model=List[QuizSummary])
 async def get_my_quizzes(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    search: Optional[str] = Query(None, max_length=200),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all quizzes created by the current user."""
-    quizzes = db.query(
-        Quiz,
-        func.count(Question.id).label("question_count")
-    ).outerjoin(Question).filter(
+    """Get the quizzes created by the current user, one page at a time."""
+    query = select(Quiz).where(
         Quiz.creator_id == current_user.id,
         Quiz.is_active == True
-    ).group_by(Quiz.id).all()
-    
-    result = []
-    for quiz, question_count in quizzes:
-        quiz_summary = QuizSummary(
-            id=quiz.id,
-            title=quiz.title,
-            description=quiz.description,
-            creator_id=quiz.creator_id,
-            is_active=quiz.is_active,
-            question_count=question_count,
-            created_at=quiz.created_at
-        )
-        result.append(quiz_summary)
-    
-    return result
+    )
+
+    return await list_quizzes(db, query, response, limit, cursor, search)
 
 
 @router.get("/", response_model=List[QuizSummary])
 async def get_all_quizzes(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    search: Optional[str] = Query(None, max_length=200),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all active quizzes (for browsing/joining games)."""
-    quizzes = db.query(
-        Quiz,
-        func.count(Question.id).label("question_count")
-    ).outerjoin(Question).filter(
-        Quiz.is_active == True
-    ).group_by(Quiz.id).all()
-
-    result = []
-    for quiz, question_count in quizzes:
-        quiz_summary = QuizSummary(
-            id=quiz.id,
-            title=quiz.title,
-            description=quiz.description,
-            creator_id=quiz.creator_id,
-            is_active=quiz.is_active,
-            question_count=question_count,
-            created_at=quiz.created_at
-        )
-        result.append(quiz_summary)
+    """Get active quizzes (for browsing/joining games), one page at a time."""
+    query = select(Quiz).where(Quiz.is_active == True)
+
+    return await list_quizzes(db, query, response, limit, cursor, search)
+
 
-    return result
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
 
 
-@router.get("/{quiz_id}", response_model=QuizSchema)
+@router.get("/{quiz_id}", response_model=PlayerQuiz)
 async def get_quiz(
     quiz_id: int,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get a specific quiz by ID (accessible to all users for playing)."""
-    quiz = db.query(Quiz).filter(
+    """Get a specific quiz by ID (accessible to all users for playing).
+
+    Options are served without ``is_correct``; the creator gets the answers
+    from /manage. The encoded payload is cached per quiz version and served with an ETag, so
+    repeat fetches skip loading and serializing the quiz, and clients that
+    send If-None-Match get a 304 with no body.
+    """
+    result = await db.execute(select(Quiz.updated_at, Quiz.created_at).where(
         Quiz.id == quiz_id,
         Quiz.is_active == True
-    ).first()
+    ))
+    quiz_version = result.first()
 
-    if not quiz:
+    if not quiz_version:
         # Check if quiz exists but is inactive
-        inactive_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+        result = await db.execute(select(Quiz.id).where(Quiz.id == quiz_id))
+        inactive_quiz = result.first()
         if inactive_quiz:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -140,22 +280,36 @@ async def get_quiz(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Quiz not found"
             )
-    
-    return quiz
+
+    updated_at, created_at = quiz_version
+    version = (updated_at or created_at).isoformat()
+
+    payload = quiz_cache.get(quiz_id, version)
+    if payload is None:
+        result = await db.execute(select(Quiz).options(FULL_QUIZ_OPTIONS).where(Quiz.id == quiz_id))
+        quiz = result.scalars().first()
+        body = PlayerQuiz.model_validate(quiz).model_dump_json().encode()
+        payload = quiz_cache.put(quiz_id, version, body)
+
+    if etag_matches(if_none_match, payload.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": payload.etag})
+
+    return Response(content=payload.body, media_type="application/json", headers={"ETag": payload.etag})
 
 
 @router.get("/{quiz_id}/manage", response_model=QuizSchema)
 async def get_quiz_for_management(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific quiz by ID for management (only quiz creator can access)."""
-    quiz = db.query(Quiz).filter(
+    result = await db.execute(select(Quiz).options(FULL_QUIZ_OPTIONS).where(
         Quiz.id == quiz_id,
         Quiz.creator_id == current_user.id,
         Quiz.is_active == True
-    ).first()
+    ))
+    quiz = result.scalars().first()
 
     if not quiz:
         raise HTTPException(
@@ -170,14 +324,15 @@ async def get_quiz_for_management(
 async def delete_quiz(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a quiz (soft delete)."""
-    quiz = db.query(Quiz).filter(
+    result = await db.execute(select(Quiz).where(
         Quiz.id == quiz_id,
         Quiz.creator_id == current_user.id,
         Quiz.is_active == True
-    ).first()
+    ))
+    quiz = result.scalars().first()
     
     if not quiz:
         raise HTTPException(
@@ -186,6 +341,8 @@ async def delete_quiz(
         )
     
     quiz.is_active = False
-    db.commit()
+    await db.commit()
+
+    quiz_cache.invalidate(quiz_id)
     
     return {"message": "Quiz deleted successfully"}
@@ -1,30 +1,121 @@
-import random
-import string
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.database import get_db
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import get_db, get_read_db, insert_or_ignore, read_your_writes, AsyncSessionLocal
 from app.models.user import User
-from app.models.quiz import Quiz, Question, Option
-from app.models.session import GameSession, SessionParticipant, PlayerAnswer, SessionStatus
+from app.models.quiz import Quiz
+from app.models.session import GameSession, SessionParticipant, SessionStatus
 from app.schemas.session import (
     GameSessionCreate,
     GameSessionJoin,
     PlayerAnswerCreate,
     GameSession as GameSessionSchema,
+    GameSessionJoined,
     SessionParticipant as SessionParticipantSchema,
+    SessionState,
+    RosterDelta,
+    RosterParticipant,
     Leaderboard,
-    LeaderboardEntry
+    LeaderboardEntry,
+    LeaderboardPosition,
+    QuestionPacket
 )
-from app.auth.auth import get_current_user
+from app.auth.auth import (
+    Principal,
+    create_user_token,
+    get_current_principal,
+    get_current_user,
+    principal_from_token
+)
+from app.services.answer_buffer import AnswerNotPersisted, DuplicateAnswer
+from app.services.events import session_events
+from app.services.game_codes import game_codes, game_code_collisions
+from app.services.live_engine import live_engine, AnswerRejected, LiveSession, QuestionNotOpen
+from app.services.progression import advance_session, finish_session, session_state
+from app.services.leaderboard import PlayerScore, SessionLeaderboard, leaderboards
 
 router = APIRouter()
 
 
-def generate_game_code() -> str:
-    """Generate a unique 6-character game code."""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+# Attempts at inserting a session before giving up on game code collisions
+GAME_CODE_ATTEMPTS = 5
+
+
+async def get_session_or_404(db: AsyncSession, session_id: int) -> GameSession:
+    """Load a game session; its roster is served separately by /roster."""
+    result = await db.execute(select(GameSession).where(GameSession.id == session_id))
+    session = result.scalars().first()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game session not found"
+        )
+
+    return session
+
+
+async def register_participant(db: AsyncSession, session_id: int, user_id: int) -> bool:
+    """Add a user to a session's participants, returning False if they already were one.
+
+    Safe to call repeatedly or concurrently: the unique (session_id, user_id)
+    index decides, and the session's participant_count only moves when a
+    player is actually added or comes back. Each change also bumps the
+    session's roster_version and stamps it on the participant row, which is
+    what /roster deltas are cut from.
+    """
+    result = await db.execute(
+        insert_or_ignore(db, SessionParticipant).values(session_id=session_id, user_id=user_id)
+    )
+    added = result.rowcount == 1
+    if not added:
+        result = await db.execute(update(SessionParticipant).where(
+            SessionParticipant.session_id == session_id,
+            SessionParticipant.user_id == user_id,
+            SessionParticipant.is_active == False
+        ).values(is_active=True))
+        added = result.rowcount == 1
+
+    if added:
+        # The session row update serialises concurrent joins, so versions
+        # are handed out (and committed) in order
+        version = await db.scalar(update(GameSession).where(GameSession.id == session_id).values(
+            participant_count=GameSession.participant_count + 1,
+            roster_version=GameSession.roster_version + 1
+        ).returning(GameSession.roster_version))
+        await db.execute(update(SessionParticipant).where(
+            SessionParticipant.session_id == session_id,
+            SessionParticipant.user_id == user_id
+        ).values(roster_version=version))
+    return added
+
+
+async def get_live_session(db: AsyncSession, session_id: int) -> LiveSession:
+    """Return the in-memory state of an active session, loading it if needed."""
+    live = live_engine.get(session_id)
+    if live is not None:
+        return live
+
+    # Session went active before this process started, load it now
+    result = await db.execute(select(GameSession).where(
+        GameSession.id == session_id,
+        GameSession.status == SessionStatus.ACTIVE
+    ))
+    session = result.scalars().first()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game session not found or not active"
+        )
+
+    return await live_engine.load(db, session)
 
 
 @router.post("/start/{quiz_id}", response_model=GameSessionSchema)
@@ -32,15 +123,16 @@ async def start_game_session(
     quiz_id: int,
     session_data: GameSessionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Start a new game session for a quiz."""
     # Check if quiz exists and belongs to user
-    quiz = db.query(Quiz).filter(
+    result = await db.execute(select(Quiz.id).where(
         Quiz.id == quiz_id,
         Quiz.creator_id == current_user.id,
         Quiz.is_active == True
-    ).first()
+    ))
+    quiz = result.first()
     
     if not quiz:
         raise HTTPException(
@@ -48,38 +140,67 @@ async def start_game_session(
             detail="Quiz not found"
         )
     
-    # Generate unique game code
-    game_code = generate_game_code()
-    while db.query(GameSession).filter(GameSession.game_code == game_code).first():
-        game_code = generate_game_code()
-    
-    # Create game session
-    db_session = GameSession(
-        quiz_id=quiz_id,
-        host_id=current_user.id,
-        game_code=game_code,
-        status=SessionStatus.WAITING,
-        question_time_limit=session_data.question_time_limit
-    )
-    
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+    await game_codes.ensure_loaded(db)
+
+    # Create game session; the pool only knows this process's codes, so
+    # another worker may have taken the same one in the meantime
+    for _ in range(GAME_CODE_ATTEMPTS):
+        game_code = game_codes.allocate()
+        db_session = GameSession(
+            quiz_id=quiz_id,
+            host_id=current_user.id,
+            game_code=game_code,
+            status=SessionStatus.WAITING,
+            question_time_limit=session_data.question_time_limit
+        )
+        db.add(db_session)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            game_codes.discard(game_code)
+            game_code_collisions.inc()
+            continue
+        game_codes.bind(game_code, db_session.id)
+        break
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate a game code, please retry"
+        )
+
+    await db.refresh(db_session, ["created_at"])
     
     return db_session
 
 
-@router.post("/join", response_model=GameSessionSchema)
+@router.post("/join", response_model=GameSessionJoined)
 async def join_game_session(
     join_data: GameSessionJoin,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Join a game session using game code."""
-    session = db.query(GameSession).filter(
-        GameSession.game_code == join_data.game_code,
-        GameSession.status.in_([SessionStatus.WAITING, SessionStatus.ACTIVE])
-    ).first()
+    await game_codes.ensure_loaded(db)
+
+    joinable = GameSession.status.in_([SessionStatus.WAITING, SessionStatus.ACTIVE])
+    session = None
+    session_id = game_codes.lookup(join_data.game_code)
+    if session_id is not None:
+        result = await db.execute(select(GameSession).where(GameSession.id == session_id, joinable))
+        session = result.scalars().first()
+        if session is None:
+            # The session finished on another worker; its code may already
+            # belong to a new game there
+            game_codes.release(join_data.game_code, session_id)
+
+    if session is None:
+        # Sessions created by another worker are not in this process's code map
+        result = await db.execute(select(GameSession).where(
+            GameSession.game_code == join_data.game_code,
+            joinable
+        ))
+        session = result.scalars().first()
     
     if not session:
         raise HTTPException(
@@ -87,39 +208,33 @@ async def join_game_session(
             detail="Game session not found or already finished"
         )
 
-    # Check if user is already a participant
-    existing_participant = db.query(SessionParticipant).filter(
-        SessionParticipant.session_id == session.id,
-        SessionParticipant.user_id == current_user.id,
-        SessionParticipant.is_active == True
-    ).first()
+    # Add user as participant, unless they already are one
+    added = await register_participant(db, session.id, current_user.id)
+    await db.commit()
 
-    if not existing_participant:
-        # Add user as participant
-        participant = SessionParticipant(
-            session_id=session.id,
-            user_id=current_user.id
-        )
-        db.add(participant)
-        db.commit()
+    if added:
+        await db.refresh(session, ["participant_count", "roster_version"])
+        await session_events.broadcast(session.id, "player_joined", {
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "participant_count": session.participant_count,
+            "roster_version": session.roster_version
+        })
 
-    return session
+    joined = GameSessionJoined.model_validate(session)
+    joined.player_token = create_user_token(current_user, session_id=session.id)
+    return joined
 
 
 @router.post("/{session_id}/start", response_model=GameSessionSchema)
 async def start_game_session_by_id(
     session_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Start a game session (change status from WAITING to ACTIVE). Only host can do this."""
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
-
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game session not found"
-        )
+    session = await get_session_or_404(db, session_id)
 
     # Check if current user is the host
     if session.host_id != current_user.id:
@@ -136,12 +251,18 @@ async def start_game_session_by_id(
         )
 
     # Update session status to active and start first question
+    now = datetime.now(timezone.utc)
     session.status = SessionStatus.ACTIVE
-    session.started_at = func.now()
-    session.current_question_started_at = func.now()
+    session.started_at = now
+    session.current_question_started_at = now
+
+    await db.commit()
+    await db.refresh(session)
 
-    db.commit()
-    db.refresh(session)
+    await live_engine.load(db, session)
+
+    await session_events.broadcast(session.id, "session_started", session_state(session))
+    read_your_writes.mark(request.headers.get("authorization"))
 
     return session
 
@@ -150,10 +271,42 @@ async def start_game_session_by_id(
 async def get_game_session(
     session_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a specific game session by ID. Players join through POST /join."""
+    return await get_session_or_404(db, session_id)
+
+
+@router.get("/{session_id}/state", response_model=SessionState)
+async def get_game_session_state(
+    session_id: int,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the progress of a game session: status, question, deadline and roster size."""
+    principal.check_session(session_id)
+    session = await get_session_or_404(db, session_id)
+
+    return SessionState(session_id=session.id, **session_state(session))
+
+
+@router.get("/{session_id}/roster", response_model=RosterDelta)
+async def get_session_roster(
+    session_id: int,
+    since: int = Query(0, ge=0),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get a specific game session by ID."""
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
+    """Get the participants that joined or changed after roster version ``since``.
+
+    Start with ``since=0`` for the whole roster, then pass back the returned
+    ``roster_version``. Rows include inactive players so clients can drop them.
+    """
+    principal.check_session(session_id)
+    result = await db.execute(select(
+        GameSession.roster_version, GameSession.participant_count
+    ).where(GameSession.id == session_id))
+    session = result.first()
 
     if not session:
         raise HTTPException(
@@ -161,25 +314,46 @@ async def get_game_session(
             detail="Game session not found"
         )
 
-    # Add user as participant
-    participant = SessionParticipant(
-        session_id=session.id,
-        user_id=current_user.id
+    participants = []
+    if since < session.roster_version:
+        # Versions are committed in order, so this is exactly the delta
+        # between the two versions
+        result = await db.execute(select(SessionParticipant, User.username).join(
+            User, SessionParticipant.user_id == User.id
+        ).where(
+            SessionParticipant.session_id == session_id,
+            SessionParticipant.roster_version > since,
+            SessionParticipant.roster_version <= session.roster_version
+        ).order_by(SessionParticipant.roster_version))
+
+        for participant, username in result.all():
+            participants.append(RosterParticipant(
+                id=participant.id,
+                session_id=participant.session_id,
+                user_id=participant.user_id,
+                username=username,
+                joined_at=participant.joined_at,
+                is_active=participant.is_active,
+                roster_version=participant.roster_version
+            ))
+
+    return RosterDelta(
+        session_id=session_id,
+        roster_version=session.roster_version,
+        participant_count=session.participant_count,
+        participants=participants
     )
-    db.add(participant)
-    db.commit()
-
-    return session
 
 
 @router.get("/{session_id}/participants", response_model=List[SessionParticipantSchema])
 async def get_session_participants(
     session_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all participants in a game session."""
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
+    result = await db.execute(select(GameSession.id).where(GameSession.id == session_id))
+    session = result.first()
 
     if not session:
         raise HTTPException(
@@ -187,12 +361,13 @@ async def get_session_participants(
             detail="Game session not found"
         )
 
-    participants = db.query(SessionParticipant, User.username).join(
+    result = await db.execute(select(SessionParticipant, User.username).join(
         User, SessionParticipant.user_id == User.id
-    ).filter(
+    ).where(
         SessionParticipant.session_id == session_id,
         SessionParticipant.is_active == True
-    ).all()
+    ))
+    participants = result.all()
 
     result = []
     for participant, username in participants:
@@ -211,17 +386,12 @@ async def get_session_participants(
 @router.post("/{session_id}/next-question", response_model=GameSessionSchema)
 async def next_question(
     session_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Move to the next question (only host can do this)."""
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
-
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game session not found"
-        )
+    session = await get_session_or_404(db, session_id)
 
     # Check if current user is the host
     if session.host_id != current_user.id:
@@ -230,21 +400,9 @@ async def next_question(
             detail="Only the host can control question progression"
         )
 
-    # Get quiz to check total questions
-    quiz = db.query(Quiz).filter(Quiz.id == session.quiz_id).first()
-    total_questions = len(quiz.questions)
-
-    if session.current_question_index >= total_questions - 1:
-        # End the session if this was the last question
-        session.status = SessionStatus.FINISHED
-        session.finished_at = func.now()
-    else:
-        # Move to next question
-        session.current_question_index += 1
-        session.current_question_started_at = func.now()
-
-    db.commit()
-    db.refresh(session)
+    await advance_session(db, session)
+    # The host's next reads must show the new question, not a lagging replica
+    read_your_writes.mark(request.headers.get("authorization"))
 
     return session
 
@@ -252,17 +410,12 @@ async def next_question(
 @router.post("/{session_id}/end", response_model=GameSessionSchema)
 async def end_game_session(
     session_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """End a game session (only host can do this)."""
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
-
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game session not found"
-        )
+    session = await get_session_or_404(db, session_id)
 
     # Check if current user is the host
     if session.host_id != current_user.id:
@@ -271,132 +424,221 @@ async def end_game_session(
             detail="Only the host can end the session"
         )
 
-    # Update session status to finished
-    session.status = SessionStatus.FINISHED
-    session.finished_at = func.now()
-
-    db.commit()
-    db.refresh(session)
+    await finish_session(db, session)
+    read_your_writes.mark(request.headers.get("authorization"))
 
     return session
 
 
+@router.get("/{session_id}/question", response_model=QuestionPacket)
+async def get_current_question(
+    session_id: int,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current question of an active session without its answers.
+
+    Served from memory. A miss loads the live state from the primary, not
+    the replica, since it is kept for the rest of the session.
+    """
+    principal.check_session(session_id)
+    live = await get_live_session(db, session_id)
+
+    if live.current_question_index >= len(live.question_packets):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+
+    return Response(
+        content=live.question_packets[live.current_question_index],
+        media_type="application/json"
+    )
+
+
 @router.post("/{session_id}/answer")
 async def submit_answer(
     session_id: int,
     answer_data: PlayerAnswerCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit an answer for a question in a game session."""
-    # Check if session exists and is active
-    session = db.query(GameSession).filter(
-        GameSession.id == session_id,
-        GameSession.status == SessionStatus.ACTIVE
-    ).first()
-    
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game session not found or not active"
+    principal.check_session(session_id)
+    live = await get_live_session(db, session_id)
+
+    async def record():
+        return await live_engine.record_answer(
+            live,
+            player_id=principal.user_id,
+            username=principal.username,
+            question_id=answer_data.question_id,
+            selected_option_id=answer_data.selected_option_id
         )
-    
-    # Check if question belongs to the quiz
-    question = db.query(Question).filter(
-        Question.id == answer_data.question_id,
-        Question.quiz_id == session.quiz_id
-    ).first()
-    
-    if not question:
+
+    try:
+        try:
+            answer = await record()
+        except QuestionNotOpen:
+            # Another worker may have moved the session on without this one
+            # hearing about it
+            if not await live_engine.sync_question(db, live):
+                raise
+            answer = await record()
+    except AnswerRejected as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Question not found in this quiz"
+            detail=str(exc)
+        )
+    except DuplicateAnswer as exc:
+        # Another worker stored this player's answer first; count that one
+        await live_engine.sync_answer(
+            db, live, principal.user_id, principal.username, answer_data.question_id
         )
-    
-    # Check if option belongs to the question
-    option = db.query(Option).filter(
-        Option.id == answer_data.selected_option_id,
-        Option.question_id == answer_data.question_id
-    ).first()
-    
-    if not option:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Option not found for this question"
+            detail=str(exc)
         )
-    
-    # Check if user already answered this question in this session
-    existing_answer = db.query(PlayerAnswer).filter(
-        PlayerAnswer.session_id == session_id,
-        PlayerAnswer.player_id == current_user.id,
-        PlayerAnswer.question_id == answer_data.question_id
-    ).first()
-    
-    if existing_answer:
+    except AnswerNotPersisted as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already answered this question"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc)
         )
-    
-    # Create player answer
-    player_answer = PlayerAnswer(
-        session_id=session_id,
-        player_id=current_user.id,
-        question_id=answer_data.question_id,
-        selected_option_id=answer_data.selected_option_id,
-        is_correct=option.is_correct,
-        answer_time=answer_data.answer_time
+
+    # Count it on the other workers holding this session too
+    await session_events.broadcast(session_id, "answer_recorded", asdict(answer))
+
+    # One answer_count frame per interval rather than one per answer
+    question_id = answer_data.question_id
+    session_events.broadcast_coalesced(
+        session_id,
+        "answer_count",
+        lambda: {"question_id": question_id, "answer_count": live.answer_counts.get(question_id, 0)},
+        delay=settings.answer_count_interval_ms / 1000,
+        key=question_id
     )
     
-    db.add(player_answer)
-    db.commit()
-    
-    return {"message": "Answer submitted successfully", "is_correct": option.is_correct}
+    return {"message": "Answer submitted successfully", "is_correct": answer.is_correct}
 
 
-@router.get("/{session_id}/leaderboard", response_model=Leaderboard)
-async def get_leaderboard(
+@router.websocket("/{session_id}/ws")
+async def session_event_stream(
+    websocket: WebSocket,
     session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    token: str = Query(...)
 ):
-    """Get the leaderboard for a game session."""
+    """Push live state changes of a game session to a connected client.
+
+    Browsers cannot set an Authorization header on a WebSocket handshake, so
+    the access token is passed as the ``token`` query parameter instead.
+    """
+    principal = principal_from_token(token)
+    if principal is None or principal.session_id not in (None, session_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    # The connection outlives any single request, so only hold a database
+    # session for the handshake check rather than depending on get_db.
+    async with AsyncSessionLocal() as db:
+        session = (await db.execute(select(GameSession).where(GameSession.id == session_id))).scalars().first()
+
+    if session is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await session_events.connect(session_id, websocket)
+    try:
+        await websocket.send_json({
+            "event": "connected",
+            "session_id": session_id,
+            "data": jsonable_encoder(session_state(session))
+        })
+        # Clients only listen; anything they send is treated as a keep-alive.
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session_events.disconnect(session_id, websocket)
+
+
+def leaderboard_entry(player: PlayerScore) -> LeaderboardEntry:
+    """Convert a player's running totals into a leaderboard entry."""
+    return LeaderboardEntry(
+        player_id=player.player_id,
+        username=player.username,
+        score=player.score,
+        correct_answers=player.score,
+        total_answers=player.total_answers,
+        average_time=player.average_time
+    )
+
+
+async def get_session_leaderboard(db: AsyncSession, session_id: int) -> SessionLeaderboard:
+    """Return the in-memory leaderboard of a session, rebuilding it if needed.
+
+    ``db`` must be the primary: a rebuilt leaderboard is cached and only
+    updated from then on, so one built from a lagging replica would stay stale.
+    """
+    live = live_engine.get(session_id)
+    if live is not None:
+        return live.leaderboard
+
+    # Only holds finished sessions, whose standings no longer change
+    board = leaderboards.get(session_id)
+    if board is not None:
+        return board
+
     # Check if session exists
-    session = db.query(GameSession).filter(GameSession.id == session_id).first()
-    
+    result = await db.execute(select(GameSession).where(GameSession.id == session_id))
+    session = result.scalars().first()
+
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Game session not found"
         )
-    
-    # Get leaderboard data with timing
-    leaderboard_data = db.query(
-        User.id,
-        User.username,
-        func.sum(PlayerAnswer.is_correct.cast(db.bind.dialect.name == 'postgresql' and 'integer' or 'int')).label('score'),
-        func.count(PlayerAnswer.id).label('total_answers'),
-        func.avg(PlayerAnswer.answer_time).label('avg_time')
-    ).join(
-        PlayerAnswer, User.id == PlayerAnswer.player_id
-    ).filter(
-        PlayerAnswer.session_id == session_id
-    ).group_by(
-        User.id, User.username
-    ).order_by(
-        func.sum(PlayerAnswer.is_correct.cast(db.bind.dialect.name == 'postgresql' and 'integer' or 'int')).desc(),
-        func.avg(PlayerAnswer.answer_time).asc()  # Faster average time as tiebreaker
-    ).all()
-
-    entries = []
-    for user_id, username, score, total_answers, avg_time in leaderboard_data:
-        entries.append(LeaderboardEntry(
-            player_id=user_id,
-            username=username,
-            score=score or 0,
-            correct_answers=score or 0,
-            total_answers=total_answers,
-            average_time=avg_time
-        ))
-    
+
+    if session.status == SessionStatus.ACTIVE:
+        # Load the whole live session rather than a bare leaderboard, so
+        # answer_recorded events from other workers keep it up to date
+        return (await live_engine.load(db, session)).leaderboard
+
+    board = await leaderboards.rebuild(db, session_id)
+    if session.status == SessionStatus.FINISHED:
+        leaderboards.store(board)
+    return board
+
+
+@router.get("/{session_id}/leaderboard", response_model=Leaderboard)
+async def get_leaderboard(
+    session_id: int,
+    limit: Optional[int] = Query(None, ge=1),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the leaderboard for a game session, optionally only the top ``limit`` players."""
+    principal.check_session(session_id)
+    board = await get_session_leaderboard(db, session_id)
+    entries = [leaderboard_entry(player) for player in board.top(limit)]
+
     return Leaderboard(session_id=session_id, entries=entries)
+
+
+@router.get("/{session_id}/leaderboard/me", response_model=LeaderboardPosition)
+async def get_my_leaderboard_position(
+    session_id: int,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's rank in a game session."""
+    principal.check_session(session_id)
+    board = await get_session_leaderboard(db, session_id)
+    player = board.get(principal.user_id)
+
+    return LeaderboardPosition(
+        session_id=session_id,
+        rank=board.rank(principal.user_id),
+        total_players=len(board),
+        entry=leaderboard_entry(player) if player else None
+    )
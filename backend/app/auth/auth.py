@@ -1,16 +1,15 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.hashing import PasswordHasherBusy, get_pwd_context, password_hasher
 from app.core.config import settings
 from app.db.database import get_db
 from app.models.user import User
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.services.user_cache import user_cache
 
 # JWT token scheme
 security = HTTPBearer()
@@ -18,16 +17,43 @@ security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the password hashing pool."""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool."""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise password_hasher_busy()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
+    # jose is imported on first use to keep it off the worker boot path
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -39,21 +65,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify a JWT token and return the username."""
+def create_user_token(user: User, session_id: Optional[int] = None) -> str:
+    """Create an access token carrying the user's id.
+
+    Passing ``session_id`` issues a player token scoped to that game session.
+    """
+    claims = {"sub": user.username, "uid": user.id}
+    if session_id is not None:
+        claims["sid"] = session_id
+    return create_access_token(claims)
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT token and return its claims."""
+    from jose import JWTError, jwt
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-        return username
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError:
         return None
 
 
-def get_current_user(
+def verify_token(token: str) -> Optional[str]:
+    """Verify a JWT token and return the username."""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload.get("sub")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The caller as described by their token, resolved without touching the database."""
+
+    user_id: int
+    username: str
+    # Set for player tokens issued when joining a game session
+    session_id: Optional[int] = None
+
+    def check_session(self, session_id: int) -> None:
+        """Reject player tokens that were issued for a different session."""
+        if self.session_id is not None and self.session_id != session_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Token is not valid for this game session"
+            )
+
+
+def principal_from_token(token: str) -> Optional[Principal]:
+    """Build a principal from a token's claims, or None if it is invalid or predates the uid claim."""
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    username = payload.get("sub")
+    user_id = payload.get("uid")
+    if username is None or not isinstance(user_id, int):
+        return None
+    return Principal(user_id=user_id, username=username, session_id=payload.get("sid"))
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get the current authenticated user."""
     credentials_exception = HTTPException(
@@ -66,18 +139,42 @@ def get_current_user(
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
+        if user is None or not user.is_active:
+            raise credentials_exception
+        user_cache.put(user)
     
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """Get the caller from the token claims alone.
+
+    Unlike get_current_user this never queries the users table, so a
+    deactivated account keeps working until its token expires. Use it on the
+    hot in-game endpoints only.
+    """
+    principal = principal_from_token(credentials.credentials)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password."""
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await check_password(password, user.hashed_password):
         return None
     return user
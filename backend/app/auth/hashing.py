@@ -0,0 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from app.core.config import settings
+from app.core.metrics import metrics
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """Return the password hashing context, importing passlib on first use."""
+    # Kept off the import path so workers that never hash boot faster
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.bcrypt_rounds
+    )
+
+password_hash_rejected = metrics.counter(
+    "quizme_password_hash_rejected_total",
+    "Password hash/verify requests refused because the hashing queue was full."
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every worker is busy and the waiting queue is full."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL while it works, so a few threads keep every core
+    busy without blocking the event loop. At most ``workers + max_queue``
+    operations are admitted at once; anything beyond that is refused straight
+    away with :class:`PasswordHasherBusy` instead of piling up behind a login
+    storm.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.in_flight = 0
+        self._executor = None
+
+    async def _run(self, func, *args):
+        if self.in_flight >= self.capacity:
+            password_hash_rejected.inc()
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="password-hash"
+            )
+        # Work beyond the pool size waits in the executor's own queue
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_pwd_context().hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(get_pwd_context().verify, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
+metrics.gauge(
+    "quizme_password_hash_in_flight",
+    "Password hash/verify operations running or waiting for a worker.",
+    callback=lambda: password_hasher.in_flight
+)
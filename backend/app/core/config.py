@@ -6,7 +6,106 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+
+    # bcrypt cost factor for new hashes; existing hashes keep their own cost.
+    # Hashing runs on password_hash_workers threads, with up to
+    # password_hash_max_queue more requests waiting before logins get a 503.
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
     database_url: str = "sqlite:///./quizme.db"
+    # Async driver URL used by the API; derived from database_url if unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    database_async_url: Optional[str] = None
+    # Read replica used by read-only endpoints (async driver derived the same
+    # way). Callers who just changed a session read from the primary for
+    # read_your_writes_seconds afterwards.
+    database_read_url: Optional[str] = None
+    read_your_writes_seconds: float = 5
+
+    # Connection pool (ignored for SQLite)
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: int = 30
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+
+    # Run the Alembic migrations when the app starts. Meant for a single
+    # process (development, a one-worker deployment); with several workers
+    # run `alembic upgrade head` once as a release step instead.
+    migrate_on_startup: bool = False
+
+    # SQLite profile: pragmas applied to every connection, and a single
+    # writer connection that writes queue for while reads use a pool of
+    # sqlite_read_pool_size connections (file databases only).
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_cache_size: int = -64000  # negative values are KiB, i.e. 64 MB
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_single_writer: bool = True
+    sqlite_read_pool_size: int = 8
+
+    # Answers from all sessions are written in group commits: the first
+    # queued answer opens a window of answer_flush_interval_ms, and the group
+    # is committed when it closes or answer_flush_max_pending answers are
+    # waiting. With answer_ack_after_commit the answer request only returns
+    # once its group is committed, or gets a 503 after answer_ack_timeout_ms;
+    # otherwise up to one group can be lost if the process crashes.
+    answer_flush_interval_ms: int = 5
+    answer_flush_max_pending: int = 500
+    answer_ack_after_commit: bool = True
+    answer_ack_timeout_ms: int = 5000
+
+    # Questions close question_time_limit seconds after they open; answers
+    # get answer_grace_ms extra to cover network latency. With
+    # auto_advance_questions the next question opens as soon as one closes,
+    # otherwise the host still moves on with next-question.
+    answer_grace_ms: int = 500
+    auto_advance_questions: bool = False
+
+    # Live answer counts are pushed to players at most once per question
+    # every answer_count_interval_ms, however fast answers come in
+    answer_count_interval_ms: int = 250
+
+    # Game codes are handed out from an in-memory pool refilled this many at a time
+    game_code_length: int = 6
+    game_code_batch_size: int = 1000
+
+    # Number of finished sessions whose final leaderboards are kept in memory
+    leaderboard_cache_sessions: int = 1000
+
+    # Quizzes committed per transaction by the bulk import endpoint
+    quiz_import_batch_size: int = 100
+
+    # Upper bound on the encoded quiz payloads kept in memory
+    quiz_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Authenticated users cached per process to skip the lookup on each
+    # request; a ttl of 0 disables the cache
+    user_cache_ttl_seconds: float = 30
+    user_cache_max_entries: int = 10000
+
+    # Pub/sub backplane carrying session events between workers, so players
+    # get them whichever worker their socket is on: unset (or memory://) for
+    # a single worker, redis://[:password@]host:port/db, or a postgresql://
+    # URL to use LISTEN/NOTIFY on the database.
+    backplane_url: Optional[str] = None
+
+    # Session affinity dispatcher (app/dispatcher.py): comma-separated base
+    # URLs of the API workers it routes to; each node gets
+    # affinity_replicas points on the consistent hash ring.
+    affinity_nodes: Optional[str] = None
+    affinity_replicas: int = 100
+    affinity_proxy_timeout_seconds: float = 30
+
+    # Opt-in request profiling: per-route latency for every request, and SQL
+    # counts and time for profiling_sample_rate of them, on /metrics.
+    # Sampled requests running one statement profiling_n_plus_one_threshold
+    # times or more are flagged as likely N+1 queries.
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.1
+    profiling_n_plus_one_threshold: int = 5
     
     class Config:
         env_file = ".env"
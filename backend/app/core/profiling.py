@@ -0,0 +1,168 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_seconds = metrics.histogram(
+    "quizme_request_duration_seconds",
+    "Time taken to handle an HTTP request, by route.",
+    ("method", "route")
+)
+requests_total = metrics.counter(
+    "quizme_requests_total",
+    "HTTP requests handled, by route and status code.",
+    ("method", "route", "status")
+)
+request_sql_queries = metrics.histogram(
+    "quizme_request_sql_queries",
+    "SQL statements executed per sampled request, by route.",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+)
+request_sql_seconds = metrics.histogram(
+    "quizme_request_sql_seconds",
+    "Time spent executing SQL per sampled request, by route.",
+    ("method", "route")
+)
+n_plus_one_requests = metrics.counter(
+    "quizme_n_plus_one_requests_total",
+    "Sampled requests that ran the same SQL statement repeatedly, by route.",
+    ("method", "route")
+)
+
+
+class RequestProfile:
+    """SQL executed while handling one sampled request."""
+
+    __slots__ = ("queries", "sql_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def repeated_statement(self, threshold: int) -> Optional[str]:
+        """Return the most repeated statement if it ran at least ``threshold`` times."""
+        if not self.statements:
+            return None
+        statement, count = max(self.statements.items(), key=lambda item: item[1])
+        return statement if count >= threshold else None
+
+
+# Set by the middleware for sampled requests; the SQLAlchemy listeners add to
+# it. Async sessions run their queries in the task that awaits them, so the
+# context is the request's own.
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        profile.sql_seconds += time.perf_counter() - starts.pop()
+    profile.queries += 1
+    profile.statements[statement] = profile.statements.get(statement, 0) + 1
+
+
+def route_template(scope) -> str:
+    """Return the path template of the route that handled a request, e.g. ``/api/sessions/{session_id}``.
+
+    Rebuilt from the request path and its path parameters: depending on the
+    FastAPI version, the matched route's own ``path`` may lack its router's
+    prefix. Unmatched paths share one label to keep the number of series bounded.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    position = 0
+    for name, value in (scope.get("path_params") or {}).items():
+        value = str(value)
+        # Parameters come in path order; replace the first occurrence after the previous one
+        for index in range(position, len(segments)):
+            if segments[index] == value:
+                segments[index] = "{%s}" % name
+                position = index + 1
+                break
+    return "/".join(segments)
+
+
+def instrument_engines(engines: Iterable[Engine]) -> None:
+    """Attach the SQL timing listeners to each (sync) engine once."""
+    for engine in set(engines):
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """Record per-route latency and, for a sample of requests, the SQL they ran.
+
+    Every HTTP request is timed into ``quizme_request_duration_seconds``; a
+    ``sample_rate`` fraction of them also has its SQL statements counted and
+    timed. A sampled request that ran one statement ``n_plus_one_threshold``
+    times or more (a query per row instead of one query) is counted and
+    logged. Routes are labelled by their path template (see ``route_template``),
+    so ``/api/sessions/1`` and ``/api/sessions/2`` share a series.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.1, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profile = RequestProfile() if random.random() < self.sample_rate else None
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_profile.reset(token)
+            self._record(scope, status_code, elapsed, profile)
+
+    def _record(self, scope, status_code: int, elapsed: float, profile: Optional[RequestProfile]) -> None:
+        path = route_template(scope)
+        method = scope["method"]
+
+        request_seconds.observe(elapsed, method=method, route=path)
+        requests_total.inc(method=method, route=path, status=str(status_code))
+        if profile is None:
+            return
+
+        request_sql_queries.observe(profile.queries, method=method, route=path)
+        request_sql_seconds.observe(profile.sql_seconds, method=method, route=path)
+        statement = profile.repeated_statement(self.n_plus_one_threshold)
+        if statement is not None:
+            n_plus_one_requests.inc(method=method, route=path)
+            logger.warning(
+                "Possible N+1 on %s %s: %d queries, this one %d times: %s",
+                method, path, profile.queries, profile.statements[statement], statement[:200]
+            )
@@ -1,25 +1,256 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from app.core.config import settings
 
-# Create SQLAlchemy engine
+# Async drivers used for each dialect when DATABASE_ASYNC_URL is not set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap a database URL's driver for its async counterpart."""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    """Return the URL of the async engine, derived from DATABASE_URL by default."""
+    if settings.database_async_url:
+        return settings.database_async_url
+    return to_async_url(settings.database_url)
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_file_sqlite(url: str) -> bool:
+    """True for SQLite databases stored in a file, which several connections can share."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def get_pool_options(url: str) -> dict:
+    """Return connection pool options from settings for a database URL."""
+    if is_file_sqlite(url):
+        # Readers only; writes go through the single writer engine below
+        return {"pool_size": settings.sqlite_read_pool_size, "max_overflow": 0}
+    if is_sqlite(url):
+        return {}
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+
+def sqlite_pragmas() -> List[str]:
+    """PRAGMA statements run on every new SQLite connection."""
+    return [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={settings.sqlite_cache_size}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+# Create SQLAlchemy engine (used by scripts and migrations)
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    **get_pool_options(settings.database_url)
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine (used by the API so queries do not block the event loop)
+async_engine = create_async_engine(
+    get_async_database_url(),
+    **get_pool_options(settings.database_url)
+)
+
+# SQLite allows one writer at a time; rather than letting concurrent
+# transactions fight over the lock until "database is locked", writes queue
+# for a single dedicated connection while reads use the pool above.
+if is_file_sqlite(settings.database_url) and settings.sqlite_single_writer:
+    write_engine = create_async_engine(
+        get_async_database_url(),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.database_pool_timeout
+    )
+else:
+    write_engine = async_engine
+
+if is_sqlite(settings.database_url):
+    for sqlite_engine in {engine, async_engine.sync_engine, write_engine.sync_engine}:
+        event.listen(sqlite_engine, "connect", apply_sqlite_pragmas)
+
+
+class RoutingSession(Session):
+    """Send writes to the writer engine and reads to the reader pool.
+
+    Once a transaction has written it stays on the writer until it ends, so
+    it reads its own uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("writer") or self._flushing or isinstance(clause, UpdateBase):
+            self.info["writer"] = True
+            return write_engine.sync_engine
+        return async_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _unpin_writer(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("writer", None)
+
+
+# Objects stay usable after commit; re-reading expired attributes would need
+# an implicit await, which async sessions cannot do.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=RoutingSession if write_engine is not async_engine else Session,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Optional read replica for read-only endpoints
+if settings.database_read_url:
+    read_engine = create_async_engine(
+        to_async_url(settings.database_read_url),
+        **get_pool_options(settings.database_read_url)
+    )
+    ReadSessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+    if is_sqlite(settings.database_read_url):
+        event.listen(read_engine.sync_engine, "connect", apply_sqlite_pragmas)
+else:
+    read_engine = async_engine
+    ReadSessionLocal = AsyncSessionLocal
+
 # Create Base class for models
 Base = declarative_base()
 
 
+class ReadYourWrites:
+    """Remember callers who just changed something so their reads skip the replica.
+
+    Keyed by the caller's Authorization header, which identifies them without
+    decoding the token. Entries last ``window`` seconds, long enough for the
+    replica to catch up. The memory is per process; clients behind several
+    workers can send ``X-Read-Your-Writes: 1`` to get the same effect.
+    """
+
+    def __init__(self, window: float, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._until: Dict[str, float] = {}
+
+    def mark(self, key: Optional[str]) -> None:
+        if not key or self.window <= 0:
+            return
+        now = time.monotonic()
+        if len(self._until) >= self.max_entries:
+            self._until = {k: until for k, until in self._until.items() if until > now}
+        self._until[key] = now + self.window
+
+    def active(self, key: Optional[str]) -> bool:
+        until = self._until.get(key) if key else None
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._until[key]
+            return False
+        return True
+
+
+read_your_writes = ReadYourWrites(settings.read_your_writes_seconds)
+
+
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
+
+
+# Dependency for read-only endpoints: a session on the read replica if one is
+# configured, unless the caller has just written and needs to see it
+async def get_read_db(request: Request):
+    primary = (
+        read_engine is async_engine
+        or request.headers.get("x-read-your-writes")
+        or read_your_writes.active(request.headers.get("authorization"))
+    )
+    session_factory = AsyncSessionLocal if primary else ReadSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+def insert_or_ignore(db, model):
+    """Build an INSERT for a model that skips rows violating a unique constraint."""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model).prefix_with("IGNORE")
+
+
+class QueryCounter:
+    """Record the SQL statements executed on an engine."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(*binds):
+    """Count queries executed inside the block, e.g. to catch N+1 regressions in tests.
+
+    Counts every engine the API uses unless specific ``binds`` are given.
+
+    Usage:
+        with count_queries() as counter:
+            client.get("/api/quizzes/1")
+        assert counter.count <= 4
+    """
+    binds = binds or tuple({async_engine.sync_engine, write_engine.sync_engine, read_engine.sync_engine})
+    counter = QueryCounter()
+    for bind in binds:
+        event.listen(bind, "before_cursor_execute", counter)
+    try:
+        yield counter
     finally:
-        db.close()
+        for bind in binds:
+            event.remove(bind, "before_cursor_execute", counter)
@@ -0,0 +1,22 @@
+import os
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+def alembic_config() -> Config:
+    """Alembic configuration for this app, usable from any working directory.
+
+    The ini file is not loaded so running migrations in-process leaves the
+    app's logging configuration alone; alembic/env.py takes the database URL
+    from settings.
+    """
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """Bring the database schema up to ``revision`` with the Alembic migrations."""
+    command.upgrade(alembic_config(), revision)
@@ -0,0 +1,169 @@
+"""Front door that sends every request about a game session to the same worker.
+
+Run it in front of several API workers:
+
+    AFFINITY_NODES=http://127.0.0.1:8001,http://127.0.0.1:8002 \\
+        uvicorn app.dispatcher:app --port 8000
+
+Requests under /api/sessions/{session_id} (WebSockets included) are hashed
+by session id onto AFFINITY_NODES with a consistent hash ring, so the worker
+holding a session's live state in memory serves all of its traffic. Other
+requests are hashed by their Authorization header, keeping each user on one
+worker's user cache. The chosen node is reported in X-QuizMe-Node.
+Request and response bodies are streamed through as they are, and headers
+keep their order and repeats.
+"""
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+import httpx
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.affinity import HashRing, routing_key_for_path
+
+# Hop-by-hop headers are between the client and the dispatcher only
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host"
+}
+
+dispatched_requests = metrics.counter(
+    "quizme_dispatched_requests_total",
+    "Requests forwarded by the dispatcher, by node and whether they were routed by session.",
+    ("node", "routing")
+)
+
+
+def parse_nodes(value: Optional[str]):
+    return [node.strip().rstrip("/") for node in (value or "").split(",") if node.strip()]
+
+
+ring = HashRing(parse_nodes(settings.affinity_nodes) or ["http://127.0.0.1:8001"], settings.affinity_replicas)
+
+
+def pick_node(path: str, authorization: Optional[str]) -> str:
+    """Return the worker that should serve a request."""
+    key = routing_key_for_path(path)
+    if key is not None:
+        node = ring.node_for(key)
+        dispatched_requests.inc(node=node, routing="session")
+    elif authorization:
+        node = ring.node_for("user:" + authorization)
+        dispatched_requests.inc(node=node, routing="user")
+    else:
+        node = random.choice(ring.nodes)
+        dispatched_requests.inc(node=node, routing="any")
+    return node
+
+
+def forwarded_headers(raw_headers) -> List[Tuple[bytes, bytes]]:
+    """Copy raw headers in order, repeated ones (e.g. Set-Cookie) included, minus hop-by-hop ones."""
+    return [
+        (name, value) for name, value in raw_headers
+        if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.client = httpx.AsyncClient(timeout=settings.affinity_proxy_timeout_seconds)
+    yield
+    await app.state.client.aclose()
+
+
+# No docs routes of its own: /docs and /openapi.json are forwarded to a worker
+app = FastAPI(title="QuizMe dispatcher", lifespan=lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+
+
+@app.get("/dispatcher/metrics")
+async def dispatcher_metrics():
+    """The dispatcher's own metrics; /metrics is forwarded to a worker like any other path."""
+    return Response(metrics.render(), media_type="text/plain")
+
+
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"])
+async def proxy_http(request: Request, path: str):
+    node = pick_node(request.url.path, request.headers.get("authorization"))
+    url = node + request.url.path
+    if request.url.query:
+        url += "?" + request.url.query
+    # Stream the body through rather than buffering it (e.g. quiz imports);
+    # requests without one stay without one
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    client: httpx.AsyncClient = request.app.state.client
+    upstream_request = client.build_request(
+        request.method,
+        url,
+        headers=forwarded_headers(request.headers.raw),
+        content=request.stream() if has_body else None
+    )
+    try:
+        upstream = await client.send(upstream_request, stream=True)
+    except httpx.HTTPError:
+        return Response(status_code=502, headers={"X-QuizMe-Node": node})
+
+    # The body is relayed as the worker encoded it, so Content-Encoding and
+    # Content-Length still apply
+    response = StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        background=BackgroundTask(upstream.aclose)
+    )
+    response.raw_headers = forwarded_headers(upstream.headers.raw) + [(b"x-quizme-node", node.encode("latin-1"))]
+    return response
+
+
+@app.websocket("/{path:path}")
+async def proxy_websocket(websocket: WebSocket, path: str):
+    from websockets.asyncio.client import connect
+    from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+    node = pick_node(websocket.url.path, None)
+    url = node.replace("http", "ws", 1) + websocket.url.path
+    if websocket.url.query:
+        url += "?" + websocket.url.query
+
+    try:
+        upstream = await connect(url)
+    except InvalidStatus:
+        # The worker refused the handshake, e.g. a bad token or unknown session
+        await websocket.close(code=1008)
+        return
+    except (OSError, ConnectionClosed, asyncio.TimeoutError):
+        await websocket.close(code=1011)
+        return
+
+    await websocket.accept()
+
+    async def client_to_upstream():
+        try:
+            while True:
+                await upstream.send(await websocket.receive_text())
+        except (WebSocketDisconnect, ConnectionClosed):
+            pass
+
+    async def upstream_to_client():
+        try:
+            async for message in upstream:
+                await websocket.send_text(message)
+        except ConnectionClosed:
+            pass
+        # The worker closed the socket (e.g. policy violation); pass it on
+        try:
+            await websocket.close(code=upstream.close_code or 1000)
+        except RuntimeError:
+            # The client is already gone
+            pass
+
+    tasks = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await upstream.close()
@@ -1,18 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth, quizzes, sessions
-from app.db.database import engine
-from app.models import user, quiz, session
+from app.auth.hashing import password_hasher
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.profiling import ProfilingMiddleware, instrument_engines
+from app.db.database import engine, async_engine, write_engine, read_engine
+from app.services.backplane import create_backplane
+from app.services.events import session_events
+from app.services.live_engine import live_engine
+from app.services.progression import on_question_deadline, sync_live_sessions
+from app.services.scheduler import question_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by Alembic (alembic upgrade head / init_db.py),
+    # not created on import; migrating here is opt-in for single-process setups
+    if settings.migrate_on_startup:
+        from app.db.migrations import upgrade_database
+        await asyncio.to_thread(upgrade_database)
+    sync_live_sessions(session_events)
+    await session_events.start(create_backplane(settings.backplane_url))
+    live_engine.start()
+    question_scheduler.start(on_question_deadline)
+    yield
+    await question_scheduler.stop()
+    await session_events.stop()
+    # Persist answers still buffered by the live engine before shutting down
+    await live_engine.stop()
+    password_hasher.shutdown()
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
-quiz.Base.metadata.create_all(bind=engine)
-session.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="QuizMe API",
     description="A Kahoot-like quiz application API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,8 +49,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers hide response headers from cross-origin scripts unless listed
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.profiling_enabled:
+    instrument_engines([engine, async_engine.sync_engine, write_engine.sync_engine, read_engine.sync_engine])
+    # Added last so it is outermost and its timings include CORS handling
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        n_plus_one_threshold=settings.profiling_n_plus_one_threshold
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(quizzes.router, prefix="/api/quizzes", tags=["quizzes"])
@@ -39,3 +77,8 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Process metrics in the Prometheus text exposition format."""
+    return metrics.render()
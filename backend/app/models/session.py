@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -11,13 +11,24 @@ class SessionStatus(enum.Enum):
     FINISHED = "finished"
 
 
+# Finished sessions give their game code back to the pool, so codes only
+# need to be unique among sessions that can still be joined.
+LIVE_SESSION = text("status != 'FINISHED'")
+
+
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        Index(
+            "uq_game_sessions_live_game_code", "game_code", unique=True,
+            sqlite_where=LIVE_SESSION, postgresql_where=LIVE_SESSION
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
     host_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    game_code = Column(String(10), unique=True, index=True, nullable=False)
+    game_code = Column(String(10), index=True, nullable=False)
     status = Column(Enum(SessionStatus), default=SessionStatus.WAITING)
     current_question_index = Column(Integer, default=0)
     question_time_limit = Column(Integer, default=30)  # seconds per question
@@ -25,6 +36,10 @@ class GameSession(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     finished_at = Column(DateTime(timezone=True), nullable=True)
     current_question_started_at = Column(DateTime(timezone=True), nullable=True)
+    # Active participants, maintained on join so reads don't count rows
+    participant_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped whenever the roster changes; clients fetch only what changed since theirs
+    roster_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     quiz = relationship("Quiz", back_populates="game_sessions")
@@ -35,12 +50,19 @@ class GameSession(Base):
 
 class SessionParticipant(Base):
     __tablename__ = "session_participants"
+    __table_args__ = (
+        # One row per player per session, however often they join
+        Index("uq_session_participants_session_user", "session_id", "user_id", unique=True),
+        Index("ix_session_participants_session_roster_version", "session_id", "roster_version"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
+    # Session roster_version at which this row last changed
+    roster_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     session = relationship("GameSession", back_populates="participants")
@@ -49,6 +71,10 @@ class SessionParticipant(Base):
 
 class PlayerAnswer(Base):
     __tablename__ = "player_answers"
+    __table_args__ = (
+        # One answer per player per question, enforced by the database
+        Index("uq_player_answers_session_player_question", "session_id", "player_id", "question_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("game_sessions.id"), nullable=False)
@@ -56,7 +82,7 @@ class PlayerAnswer(Base):
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
     selected_option_id = Column(Integer, ForeignKey("options.id"), nullable=False)
     is_correct = Column(Boolean, nullable=False)
-    answer_time = Column(Integer, nullable=True)  # time taken in seconds
+    answer_time = Column(Float, nullable=True)  # seconds from the question opening, measured by the server
     answered_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -60,6 +60,39 @@ class Quiz(QuizBase):
         from_attributes = True
 
 
+class PlayerOption(BaseModel):
+    """An option as players see it, without its correctness flag."""
+    id: int
+    text: str
+    order: int
+
+    class Config:
+        from_attributes = True
+
+
+class PlayerQuestion(QuestionBase):
+    id: int
+    quiz_id: int
+    options: List[PlayerOption] = []
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PlayerQuiz(QuizBase):
+    """A quiz as served to players: the full tree minus the answers."""
+    id: int
+    creator_id: int
+    is_active: bool
+    questions: List[PlayerQuestion] = []
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class QuizSummary(QuizBase):
     id: int
     creator_id: int
@@ -69,3 +102,13 @@ class QuizSummary(QuizBase):
 
     class Config:
         from_attributes = True
+
+
+class QuizImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class QuizImportResult(BaseModel):
+    imported: int
+    errors: List[QuizImportError] = []
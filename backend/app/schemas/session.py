@@ -16,7 +16,7 @@ class GameSessionJoin(BaseModel):
 class PlayerAnswerCreate(BaseModel):
     question_id: int
     selected_option_id: int
-    answer_time: Optional[float] = None  # time taken to answer in seconds
+    answer_time: Optional[float] = None  # ignored, the server measures answer times
 
 
 class PlayerAnswer(BaseModel):
@@ -56,12 +56,59 @@ class GameSession(BaseModel):
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     current_question_started_at: Optional[datetime] = None
-    participants: List[SessionParticipant] = []
+    participant_count: int = 0
+    roster_version: int = 0
 
     class Config:
         from_attributes = True
 
 
+class GameSessionJoined(GameSession):
+    # Token scoped to this session; lets in-game endpoints skip the user lookup
+    player_token: Optional[str] = None
+
+
+class SessionState(BaseModel):
+    """The small, frequently polled part of a session; the roster is fetched separately."""
+    session_id: int
+    status: SessionStatus
+    current_question_index: int
+    current_question_started_at: Optional[datetime] = None
+    question_deadline: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    participant_count: int
+    roster_version: int
+
+
+class RosterParticipant(SessionParticipant):
+    roster_version: int
+
+
+class RosterDelta(BaseModel):
+    """Participants that joined or changed after the client's roster version."""
+    session_id: int
+    roster_version: int  # pass back as ``since`` on the next request
+    participant_count: int
+    participants: List[RosterParticipant]
+
+
+class PacketOption(BaseModel):
+    id: int
+    text: str
+    order: int
+
+
+class QuestionPacket(BaseModel):
+    """What players see of a question: no correctness flags, no other questions."""
+    session_id: int
+    question_index: int
+    total_questions: int
+    question_id: int
+    text: str
+    options: List[PacketOption]
+    time_limit: int  # seconds
+
+
 class LeaderboardEntry(BaseModel):
     player_id: int
     username: str
@@ -74,3 +121,10 @@ class LeaderboardEntry(BaseModel):
 class Leaderboard(BaseModel):
     session_id: int
     entries: List[LeaderboardEntry]
+
+
+class LeaderboardPosition(BaseModel):
+    session_id: int
+    rank: Optional[int] = None  # 1-based, None if the player has not answered yet
+    total_players: int
+    entry: Optional[LeaderboardEntry] = None
@@ -0,0 +1,52 @@
+import bisect
+import hashlib
+import re
+from typing import Dict, List, Optional, Sequence
+
+# Session endpoints carry the session id right after the prefix
+SESSION_PATH = re.compile(r"^/api/sessions/(\d+)(?:/|$)")
+
+
+def stable_hash(key: str) -> int:
+    """A 64-bit hash that is the same in every process (unlike ``hash()``)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of routing keys onto a set of nodes.
+
+    Each node is placed on the ring at ``replicas`` points; a key belongs to
+    the first node point at or after its own hash. Adding or removing a node
+    only moves the keys next to its points, about 1/n of them, so the other
+    workers keep the sessions they already hold in memory.
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 100):
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node")
+        self.nodes = list(dict.fromkeys(nodes))
+        self.replicas = replicas
+        points: Dict[int, str] = {}
+        for node in self.nodes:
+            for replica in range(replicas):
+                points[stable_hash("%s#%d" % (node, replica))] = node
+        self._hashes: List[int] = sorted(points)
+        self._owners: List[str] = [points[point] for point in self._hashes]
+
+    def node_for(self, key: str) -> str:
+        """Return the node that owns ``key``."""
+        index = bisect.bisect_left(self._hashes, stable_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+def session_routing_key(session_id: int) -> str:
+    """The routing key every request about a game session is hashed by."""
+    return "session:%d" % session_id
+
+
+def routing_key_for_path(path: str) -> Optional[str]:
+    """Return the session routing key of a request path, if it is about one session."""
+    match = SESSION_PATH.match(path)
+    if match is None:
+        return None
+    return session_routing_key(int(match.group(1)))
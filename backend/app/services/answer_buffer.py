@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import AsyncSessionLocal, insert_or_ignore
+from app.models.session import PlayerAnswer
+
+logger = logging.getLogger(__name__)
+
+answer_commit_seconds = metrics.histogram(
+    "quizme_answer_commit_seconds",
+    "Time taken to write one group of buffered answers."
+)
+answer_commit_rows = metrics.counter(
+    "quizme_answer_commit_rows_total",
+    "Answers written by group commits."
+)
+answer_commit_failures = metrics.counter(
+    "quizme_answer_commit_failures_total",
+    "Group commits that failed and were retried row by row."
+)
+answer_rows_failed = metrics.counter(
+    "quizme_answer_rows_failed_total",
+    "Answers that could not be written, or were not confirmed in time, and were rolled back."
+)
+answer_rows_duplicate = metrics.counter(
+    "quizme_answer_rows_duplicate_total",
+    "Answers rolled back because the player's answer to the question was already stored, e.g. by another worker."
+)
+
+# (session_id, player_id, question_id), unique in player_answers
+AnswerKey = Tuple[int, int, int]
+
+
+def answer_key(row: dict) -> AnswerKey:
+    return row["session_id"], row["player_id"], row["question_id"]
+
+
+class AnswerNotPersisted(Exception):
+    """Raised to a caller waiting for its answer's commit when the answer was not written."""
+
+
+class DuplicateAnswer(AnswerNotPersisted):
+    """Raised when the database already holds an answer from the player to the question."""
+
+
+@dataclass(eq=False)
+class PendingAnswer:
+    """A queued ``player_answers`` row and what to do if it cannot be written."""
+
+    row: dict
+    rollback: Optional[Callable[[], None]] = None
+    waiter: Optional[asyncio.Future] = None
+
+    def fail(self, error: Optional[AnswerNotPersisted] = None) -> None:
+        if error is None:
+            answer_rows_failed.inc()
+            error = AnswerNotPersisted("The answer could not be saved, please retry")
+        if self.rollback is not None:
+            self.rollback()
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_exception(error)
+
+    def settle(self, written: Set[AnswerKey]) -> None:
+        """Acknowledge the row if its insert went through, otherwise fail it as a duplicate."""
+        if answer_key(self.row) not in written:
+            answer_rows_duplicate.inc()
+            self.fail(DuplicateAnswer("You have already answered this question"))
+            return
+        answer_commit_rows.inc()
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+
+class AnswerBuffer:
+    """Coalesce answer inserts from every session into group commits.
+
+    The first queued answer opens a commit window of ``window`` seconds;
+    everything that arrives in it (or the first ``max_rows`` answers, if that
+    comes sooner) is written in one transaction. On SQLite that turns one
+    fsync per answer into one per group.
+
+    With ``ack_after_commit`` callers of :meth:`put` wait until their group is
+    committed, so an acknowledged answer is durable. Without it they return
+    as soon as the answer is queued and up to one window of answers can be
+    lost in a crash.
+
+    Inserts skip rows that hit the unique (session, player, question) index,
+    e.g. an answer another worker accepted first; such a row is rolled back
+    and its caller gets :class:`DuplicateAnswer`. If a group fails, its rows
+    are retried one per transaction so a single bad row only fails itself. A row that still cannot be written is given
+    up: its ``rollback`` undoes whatever the caller did in memory and a
+    waiting caller gets :class:`AnswerNotPersisted`. Callers wait at most
+    ``ack_timeout`` seconds; an answer still queued by then is withdrawn and
+    rolled back the same way.
+    """
+
+    def __init__(self, window: float, max_rows: int, ack_after_commit: bool, ack_timeout: float):
+        self.window = window
+        self.max_rows = max_rows
+        self.ack_after_commit = ack_after_commit
+        self.ack_timeout = ack_timeout
+        self._pending: List[PendingAnswer] = []
+        self._lock = asyncio.Lock()
+        self._has_rows = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start the background commit task."""
+        if self._task is None:
+            # Bind the synchronisation primitives to the loop the app runs on
+            self._lock = asyncio.Lock()
+            self._has_rows = asyncio.Event()
+            self._full = asyncio.Event()
+            if self._pending:
+                self._has_rows.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the commit task and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def put(self, row: dict, rollback: Optional[Callable[[], None]] = None) -> None:
+        """Queue a ``player_answers`` row, waiting for its commit if configured to.
+
+        ``rollback`` is called if the row ends up not being written. Raises
+        :class:`AnswerNotPersisted` to a waiting caller in that case, or if
+        the commit is not confirmed within ``ack_timeout``.
+        """
+        entry = PendingAnswer(row, rollback)
+        self._pending.append(entry)
+        self._has_rows.set()
+        if len(self._pending) >= self.max_rows:
+            self._full.set()
+
+        if not self.ack_after_commit:
+            return
+        entry.waiter = asyncio.get_running_loop().create_future()
+        if self._task is None:
+            # No commit task (e.g. scripts outside the app lifespan): write now
+            await self.flush()
+        try:
+            # Shielded so the timeout doesn't cancel the waiter the commit task settles
+            await asyncio.wait_for(asyncio.shield(entry.waiter), timeout=self.ack_timeout)
+        except asyncio.TimeoutError:
+            # Nobody waits for the outcome any more
+            entry.waiter = None
+            if entry in self._pending:
+                # Not picked up by a commit yet: withdraw it
+                self._pending.remove(entry)
+                entry.fail()
+            # Otherwise its commit is in flight and still settles it
+            raise AnswerNotPersisted("The answer could not be confirmed in time, please retry")
+
+    async def flush(self) -> None:
+        """Write all queued answers, in a single transaction unless that fails."""
+        async with self._lock:
+            entries, self._pending = self._pending, []
+            self._full.clear()
+            if not entries:
+                return
+
+            start = time.perf_counter()
+            try:
+                written = await self._write([entry.row for entry in entries])
+            except asyncio.CancelledError:
+                # Stopped mid-commit: keep the rows for the final flush,
+                # which skips them if this commit went through after all
+                self._pending[:0] = entries
+                raise
+            except Exception:
+                logger.exception("Failed to persist a group of %d answers, retrying them one by one", len(entries))
+                answer_commit_failures.inc()
+                await self._write_each(entries)
+                return
+
+            answer_commit_seconds.observe(time.perf_counter() - start)
+            for entry in entries:
+                entry.settle(written)
+
+    async def _write_each(self, entries: List[PendingAnswer]) -> None:
+        for index, entry in enumerate(entries):
+            try:
+                written = await self._write([entry.row])
+            except asyncio.CancelledError:
+                self._pending[:0] = entries[index:]
+                raise
+            except Exception:
+                logger.exception("Dropping answer that could not be persisted: %r", entry.row)
+                entry.fail()
+                continue
+            entry.settle(written)
+
+    @staticmethod
+    async def _write(rows: List[dict]) -> Set[AnswerKey]:
+        """Insert rows in one transaction and return the keys of those actually inserted."""
+        async with AsyncSessionLocal() as db:
+            # The unique (session, player, question) index is the final word on
+            # duplicates; rows that hit it are skipped rather than failing the
+            # whole group, and left out of RETURNING.
+            result = await db.execute(
+                insert_or_ignore(db, PlayerAnswer).returning(
+                    PlayerAnswer.session_id, PlayerAnswer.player_id, PlayerAnswer.question_id
+                ),
+                rows
+            )
+            written = {tuple(row) for row in result.all()}
+            await db.commit()
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_rows.wait()
+            if len(self._pending) < self.max_rows:
+                # Let the rest of the burst join this group
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            self._has_rows.clear()
+            await self.flush()
+            if self._pending:
+                self._has_rows.set()
+
+
+answer_buffer = AnswerBuffer(
+    window=settings.answer_flush_interval_ms / 1000,
+    max_rows=settings.answer_flush_max_pending,
+    ack_after_commit=settings.answer_ack_after_commit,
+    ack_timeout=settings.answer_ack_timeout_ms / 1000
+)
+
+metrics.gauge(
+    "quizme_answer_queue_depth",
+    "Answers waiting for the next group commit.",
+    callback=lambda: len(answer_buffer)
+)
@@ -0,0 +1,409 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+
+DEFAULT_CHANNEL = "quizme_session_events"
+
+backplane_published = metrics.counter(
+    "quizme_backplane_published_total",
+    "Messages published to the backplane."
+)
+backplane_received = metrics.counter(
+    "quizme_backplane_received_total",
+    "Messages received from the backplane."
+)
+backplane_failures = metrics.counter(
+    "quizme_backplane_publish_failures_total",
+    "Messages that could not be published to the backplane."
+)
+
+
+class BackplaneError(Exception):
+    """Raised when a message cannot be handed to the backplane."""
+
+
+class Backplane:
+    """Fans messages out to every worker that shares a channel.
+
+    ``publish`` sends a text message to all workers, the publishing one
+    included; each worker's ``handler`` is called once per message, in the
+    order the backplane delivered them.
+    """
+
+    async def start(self, handler: MessageHandler) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    async def publish(self, message: str) -> None:
+        raise NotImplementedError
+
+
+class InProcessBackplane(Backplane):
+    """Delivers messages straight to this process: the single worker setup."""
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._handler = None
+
+    async def publish(self, message: str) -> None:
+        backplane_published.inc()
+        if self._handler is not None:
+            backplane_received.inc()
+            await self._handler(message)
+
+
+class RedisError(Exception):
+    """An error reply from the Redis server."""
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Read one RESP reply; bulk strings are returned as bytes."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Redis closed the connection")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RedisError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RedisError("Unexpected reply from Redis: %r" % line)
+
+
+class RedisConnection:
+    """A minimal Redis client: enough RESP for AUTH, SELECT, PUBLISH and SUBSCRIBE.
+
+    ``open`` and ``execute`` give up with :class:`asyncio.TimeoutError` after
+    ``timeout`` seconds. A command that timed out may still get its reply
+    later, so the connection is out of step and should be closed.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: Optional[float] = None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def open(cls, url: str, timeout: Optional[float] = None) -> "RedisConnection":
+        """Connect to ``redis://[[user]:password@]host[:port][/db]``."""
+        parsed = urlparse(url)
+
+        async def connect() -> "RedisConnection":
+            reader, writer = await asyncio.open_connection(parsed.hostname or "localhost", parsed.port or 6379)
+            connection = cls(reader, writer, timeout)
+            try:
+                if parsed.password is not None:
+                    credentials = [unquote(parsed.password)]
+                    if parsed.username:
+                        credentials.insert(0, unquote(parsed.username))
+                    await connection.execute("AUTH", *credentials)
+                db = parsed.path.lstrip("/")
+                if db and db != "0":
+                    await connection.execute("SELECT", db)
+            except BaseException:
+                await connection.close()
+                raise
+            return connection
+
+        return await asyncio.wait_for(connect(), timeout)
+
+    async def execute(self, *args):
+        """Send a command and return its reply."""
+        async def round_trip():
+            async with self._lock:
+                self.writer.write(encode_command(*args))
+                await self.writer.drain()
+                return await read_reply(self.reader)
+
+        # Time spent queued behind other commands counts too, so callers
+        # don't pile up behind a connection that stopped answering
+        return await asyncio.wait_for(round_trip(), self.timeout)
+
+    async def send(self, *args) -> None:
+        """Send a command without waiting for its reply (subscriber connections)."""
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub on one channel: one connection publishes, one subscribes.
+
+    The subscriber reconnects with backoff if the connection drops; messages
+    published while it is down are lost, as with any Redis pub/sub client.
+    Connecting and each command on the publisher wait at most
+    ``connect_timeout`` seconds, so a stalled Redis fails publishes with
+    :class:`BackplaneError` instead of holding up their callers.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        channel: str = DEFAULT_CHANNEL,
+        max_backoff: float = 5.0,
+        connect_timeout: float = 5.0
+    ):
+        self.url = url
+        self.channel = channel
+        self.max_backoff = max_backoff
+        self.connect_timeout = connect_timeout
+        self._handler: Optional[MessageHandler] = None
+        self._publisher: Optional[RedisConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribed: Optional[asyncio.Event] = None
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+        try:
+            self._publisher = await RedisConnection.open(self.url, self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise BackplaneError("Could not connect to Redis within %.1fs" % self.connect_timeout)
+        self._subscribed = asyncio.Event()
+        self._task = asyncio.create_task(self._listen())
+        # Don't report ready before this worker will see its own messages
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise BackplaneError("Could not subscribe to Redis channel %s" % self.channel)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._drop_publisher()
+
+    async def _drop_publisher(self) -> None:
+        if self._publisher is not None:
+            await self._publisher.close()
+            self._publisher = None
+
+    async def publish(self, message: str) -> None:
+        for attempt in range(2):
+            try:
+                if self._publisher is None:
+                    self._publisher = await RedisConnection.open(self.url, self.connect_timeout)
+                await self._publisher.execute("PUBLISH", self.channel, message)
+                backplane_published.inc()
+                return
+            except RedisError as exc:
+                # An error reply (NOAUTH, OOM, ...), possibly to AUTH while
+                # connecting. Retrying now won't help; reconnect next time so
+                # AUTH/SELECT are sent again
+                await self._drop_publisher()
+                raise BackplaneError("Redis refused to publish: %s" % exc)
+            except asyncio.TimeoutError:
+                # Checked before OSError, which TimeoutError derives from on
+                # Python 3.11+. Don't wait another timeout on a retry
+                await self._drop_publisher()
+                raise BackplaneError("Redis did not answer within %.1fs" % self.connect_timeout)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError) as exc:
+                # Reconnect once, e.g. after a Redis restart
+                await self._drop_publisher()
+                error = exc
+        raise BackplaneError("Could not publish to Redis: %s" % error)
+
+    async def _listen(self) -> None:
+        failures = 0
+        while True:
+            connection = None
+            try:
+                connection = await RedisConnection.open(self.url, self.connect_timeout)
+                await connection.send("SUBSCRIBE", self.channel)
+                while True:
+                    reply = await read_reply(connection.reader)
+                    if not isinstance(reply, list) or len(reply) < 3:
+                        continue
+                    kind = reply[0]
+                    if kind == b"subscribe":
+                        failures = 0
+                        self._subscribed.set()
+                    elif kind == b"message":
+                        backplane_received.inc()
+                        await self._deliver(reply[2].decode())
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, RedisError) as exc:
+                failures += 1
+                delay = min(self.max_backoff, 0.1 * 2 ** failures)
+                logger.warning("Redis backplane subscription lost (%s), retrying in %.1fs", exc, delay)
+                await asyncio.sleep(delay)
+            finally:
+                if connection is not None:
+                    await connection.close()
+
+    async def _deliver(self, message: str) -> None:
+        try:
+            await self._handler(message)
+        except Exception:
+            logger.exception("Backplane message handler failed")
+
+
+class PostgresBackplane(Backplane):
+    """Postgres LISTEN/NOTIFY on one channel, for deployments without Redis.
+
+    One asyncpg connection listens and another sends ``pg_notify``.
+    Notifications are queued and handled one at a time so they keep their
+    order. NOTIFY payloads are limited to 8000 bytes, which session events
+    stay well under.
+    """
+
+    MAX_PAYLOAD = 7999
+
+    def __init__(self, dsn: str, channel: str = DEFAULT_CHANNEL, max_backoff: float = 5.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.max_backoff = max_backoff
+        self._handler: Optional[MessageHandler] = None
+        self._listener = None
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def _connect(self):
+        import asyncpg
+        return await asyncpg.connect(self.dsn)
+
+    async def start(self, handler: MessageHandler) -> None:
+        self._handler = handler
+        self._queue = asyncio.Queue()
+        self._publish_lock = asyncio.Lock()
+        await self._listen()
+        self._tasks.append(asyncio.create_task(self._consume()))
+
+    async def stop(self) -> None:
+        # Closing the listener below fires the termination callback; don't reconnect
+        self._handler = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for connection in (self._listener, self._publisher):
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        self._listener = self._publisher = None
+
+    async def publish(self, message: str) -> None:
+        if len(message.encode()) > self.MAX_PAYLOAD:
+            raise BackplaneError("Message of %d bytes is too large for NOTIFY" % len(message.encode()))
+        async with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None or self._publisher.is_closed():
+                        self._publisher = await self._connect()
+                    await self._publisher.execute("SELECT pg_notify($1, $2)", self.channel, message)
+                    backplane_published.inc()
+                    return
+                except Exception as exc:
+                    # asyncpg's connection errors don't derive from
+                    # ConnectionError; reconnect once whatever went wrong
+                    self._publisher = None
+                    error = exc
+        raise BackplaneError("Could not publish to Postgres: %s" % error)
+
+    async def _listen(self) -> None:
+        self._listener = await self._connect()
+        self._listener.add_termination_listener(self._on_terminated)
+        await self._listener.add_listener(self.channel, self._on_notification)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        backplane_received.inc()
+        self._queue.put_nowait(payload)
+
+    def _on_terminated(self, connection) -> None:
+        if self._handler is not None and self._listener is connection:
+            self._tasks.append(asyncio.create_task(self._reconnect()))
+
+    async def _reconnect(self) -> None:
+        failures = 0
+        while True:
+            failures += 1
+            delay = min(self.max_backoff, 0.1 * 2 ** failures)
+            logger.warning("Postgres backplane listener lost, reconnecting in %.1fs", delay)
+            await asyncio.sleep(delay)
+            try:
+                await self._listen()
+                return
+            except Exception as exc:
+                logger.warning("Postgres backplane reconnect failed: %s", exc)
+
+    async def _consume(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._handler(message)
+            except Exception:
+                logger.exception("Backplane message handler failed")
+
+
+def parse_backplane_url(url: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Return the backplane kind for ``url`` and the URL its client should use."""
+    if not url or url.startswith("memory:"):
+        return "memory", None
+    scheme = url.split("://", 1)[0]
+    if scheme in ("redis", "rediss"):
+        if scheme == "rediss":
+            raise ValueError("TLS Redis URLs (rediss://) are not supported by the built-in client")
+        return "redis", url
+    if scheme.split("+", 1)[0] in ("postgresql", "postgres"):
+        # asyncpg takes a plain postgresql:// DSN, without a driver suffix
+        return "postgres", "postgresql://" + url.split("://", 1)[1]
+    raise ValueError("Unsupported backplane URL: %s" % url)
+
+
+def create_backplane(url: Optional[str]) -> Backplane:
+    """Build the backplane configured by ``url`` (memory://, redis:// or postgresql://)."""
+    kind, client_url = parse_backplane_url(url)
+    if kind == "redis":
+        return RedisBackplane(client_url)
+    if kind == "postgres":
+        return PostgresBackplane(client_url)
+    return InProcessBackplane()
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from fastapi import WebSocket
+from fastapi.encoders import jsonable_encoder
+from app.services.backplane import Backplane, BackplaneError, InProcessBackplane, backplane_failures
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+
+class SessionEventManager:
+    """Track WebSocket connections per game session and fan out events to them.
+
+    Events go through a :class:`Backplane` so that, with several workers,
+    players receive them whichever worker their socket is connected to. Each
+    worker then sends the event to its own sockets for that session.
+
+    Workers also use events to keep their in-memory copies of a session in
+    step: a handler registered with :meth:`on` runs on every worker, the
+    publishing one included, before the event reaches sockets. Internal
+    events only go to handlers.
+    """
+
+    def __init__(self, backplane: Optional[Backplane] = None):
+        self._connections: Dict[int, Set[WebSocket]] = defaultdict(set)
+        self.backplane = backplane or InProcessBackplane()
+        self._started = False
+        self._deferred: Dict[Tuple[int, str, Hashable], asyncio.Task] = {}
+        self._handlers: Dict[str, EventHandler] = {}
+        self._internal: Set[str] = set()
+
+    def on(self, event: str, handler: EventHandler, internal: bool = False) -> None:
+        """Call ``handler(session_id, data)`` on every worker when ``event`` is broadcast.
+
+        ``internal`` events are not sent to sockets.
+        """
+        self._handlers[event] = handler
+        if internal:
+            self._internal.add(event)
+
+    async def start(self, backplane: Optional[Backplane] = None) -> None:
+        """Subscribe to the backplane, replacing the in-process one if given another."""
+        if backplane is not None:
+            self.backplane = backplane
+        await self.backplane.start(self.deliver)
+        self._started = True
+
+    async def stop(self) -> None:
+        for task in list(self._deferred.values()):
+            task.cancel()
+        await asyncio.gather(*self._deferred.values(), return_exceptions=True)
+        self._deferred.clear()
+        if self._started:
+            self._started = False
+            await self.backplane.stop()
+
+    async def connect(self, session_id: int, websocket: WebSocket) -> None:
+        """Accept a WebSocket and subscribe it to a session's events."""
+        await websocket.accept()
+        self._connections[session_id].add(websocket)
+
+    def disconnect(self, session_id: int, websocket: WebSocket) -> None:
+        """Unsubscribe a WebSocket from a session's events."""
+        connections = self._connections.get(session_id)
+        if connections is None:
+            return
+        connections.discard(websocket)
+        if not connections:
+            del self._connections[session_id]
+
+    async def broadcast(self, session_id: int, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Send an event to every socket subscribed to a session, on every worker.
+
+        The message is encoded once, prefixed with the session id and event
+        name so workers can route it without decoding the JSON, and published
+        on the backplane.
+        """
+        message = json.dumps(jsonable_encoder({
+            "event": event,
+            "session_id": session_id,
+            "data": data or {}
+        }))
+        envelope = "%d:%s:%s" % (session_id, event, message)
+        if not self._started:
+            # No backplane subscription (e.g. scripts outside the app lifespan)
+            await self.deliver(envelope)
+            return
+        try:
+            await self.backplane.publish(envelope)
+        except BackplaneError:
+            # Better to reach this worker's players than nobody
+            logger.exception("Failed to publish %s for session %d", event, session_id)
+            backplane_failures.inc()
+            await self.deliver(envelope)
+
+    def broadcast_coalesced(
+        self,
+        session_id: int,
+        event: str,
+        data: Callable[[], Dict[str, Any]],
+        delay: float,
+        key: Hashable = None
+    ) -> None:
+        """Broadcast an event ``delay`` seconds from now, with ``data()`` as it is then.
+
+        Calls for the same session, event and ``key`` made while one is
+        pending are folded into it, so a burst of updates (e.g. every answer
+        to a question) costs one frame per socket per ``delay``.
+        """
+        deferred_key = (session_id, event, key)
+        if deferred_key in self._deferred:
+            return
+
+        async def send_later():
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                # Updates from now on need a new frame
+                del self._deferred[deferred_key]
+            await self.broadcast(session_id, event, data())
+
+        self._deferred[deferred_key] = asyncio.create_task(send_later())
+
+    async def deliver(self, envelope: str) -> None:
+        """Send a published event to this worker's sockets for its session.
+
+        The event's handler, if any, runs first. The same text frame is then
+        sent to every connection; sockets that fail to receive it are dropped.
+        """
+        session_id, event, message = envelope.split(":", 2)
+        session_id = int(session_id)
+
+        handler = self._handlers.get(event)
+        if handler is not None:
+            try:
+                await handler(session_id, json.loads(message)["data"])
+            except Exception:
+                logger.exception("Handler for %s failed for session %d", event, session_id)
+        if event in self._internal:
+            return
+
+        connections = list(self._connections.get(session_id, ()))
+        if not connections:
+            return
+
+        results = await asyncio.gather(
+            *(websocket.send_text(message) for websocket in connections),
+            return_exceptions=True
+        )
+        for websocket, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(session_id, websocket)
+
+
+session_events = SessionEventManager()
@@ -0,0 +1,107 @@
+import asyncio
+import random
+import string
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.session import GameSession, SessionStatus
+
+GAME_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+game_code_collisions = metrics.counter(
+    "quizme_game_code_collisions_total",
+    "Allocated game codes rejected by the database because another process was using them."
+)
+
+
+class GameCodeAllocator:
+    """Hands out game codes from an in-memory pool and maps live codes to sessions.
+
+    Fresh codes are generated in batches, skipping any code held by a live
+    session, so allocating one is a pop with no database round trip. Codes of
+    finished sessions are released to the back of a recycle queue and are
+    only reused once the fresh batch runs out, which keeps a stale code from
+    pointing players at a brand new game straight away.
+
+    The pool only knows about this process. With several workers the partial
+    unique index on ``game_code`` stays the source of truth: callers retry
+    with a new code if the insert hits it (see ``discard``), and ``lookup``
+    misses fall back to the database. Sessions finished on another worker
+    are released here when their session_finished event arrives.
+    """
+
+    def __init__(self, length: int, batch_size: int):
+        self.length = length
+        self.batch_size = batch_size
+        self._fresh: Deque[str] = deque()
+        self._recycled: Deque[str] = deque()
+        self._reserved: Set[str] = set()
+        self._live: Dict[str, int] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _generate(self) -> None:
+        taken = set(self._live) | self._reserved | set(self._recycled)
+        batch = set()
+        while len(batch) < self.batch_size:
+            code = "".join(random.choices(GAME_CODE_ALPHABET, k=self.length))
+            if code not in taken:
+                batch.add(code)
+        self._fresh.extend(batch)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Register the codes of sessions that were live before this process started."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            result = await db.execute(select(GameSession.game_code, GameSession.id).where(
+                GameSession.status != SessionStatus.FINISHED
+            ))
+            for code, session_id in result.all():
+                self._live[code] = session_id
+            self._loaded = True
+
+    def allocate(self) -> str:
+        """Reserve a code that no live session in this process is using."""
+        while True:
+            if self._fresh:
+                code = self._fresh.popleft()
+            elif len(self._recycled) >= self.batch_size:
+                code = self._recycled.popleft()
+            else:
+                self._generate()
+                continue
+            if code not in self._live and code not in self._reserved:
+                self._reserved.add(code)
+                return code
+
+    def bind(self, code: str, session_id: int) -> None:
+        """Record that a reserved code now belongs to a created session."""
+        self._reserved.discard(code)
+        self._live[code] = session_id
+
+    def discard(self, code: str) -> None:
+        """Drop a reserved code that could not be used, e.g. after a unique index collision."""
+        self._reserved.discard(code)
+
+    def release(self, code: str, session_id: int) -> None:
+        """Return the code of a finished session to the pool."""
+        # The code may already belong to a newer session if this one was
+        # finished before
+        if self._live.get(code) == session_id:
+            del self._live[code]
+            self._recycled.append(code)
+
+    def lookup(self, code: str) -> Optional[int]:
+        return self._live.get(code)
+
+
+game_codes = GameCodeAllocator(
+    length=settings.game_code_length,
+    batch_size=settings.game_code_batch_size
+)
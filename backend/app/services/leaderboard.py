@@ -0,0 +1,174 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sortedcontainers import SortedList
+from app.core.config import settings
+from app.models.user import User
+from app.models.session import PlayerAnswer
+
+
+@dataclass
+class PlayerScore:
+    """Running totals for one player in a session."""
+
+    player_id: int
+    username: str
+    score: int = 0
+    total_answers: int = 0
+    answer_time_total: float = 0.0
+    timed_answers: int = 0
+
+    @property
+    def average_time(self) -> Optional[float]:
+        if not self.timed_answers:
+            return None
+        return self.answer_time_total / self.timed_answers
+
+
+class SessionLeaderboard:
+    """Leaderboard of one session, kept sorted as answers come in.
+
+    Players are ordered by score (descending) then average answer time
+    (ascending, players without a timed answer last), with the player id as
+    a final tiebreaker so the order is deterministic. The sort keys live in a
+    ``SortedList``, so moving a player after an answer, "my rank" and top-N
+    are all O(log n) (top-N plus the N players returned).
+    """
+
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+        self._players: Dict[int, PlayerScore] = {}
+        self._keys: SortedList = SortedList()
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    @staticmethod
+    def _sort_key(player: PlayerScore) -> Tuple[int, float, int]:
+        average_time = player.average_time
+        return (
+            -player.score,
+            math.inf if average_time is None else average_time,
+            player.player_id
+        )
+
+    def record(self, player_id: int, username: str, is_correct: bool, answer_time: Optional[float]) -> None:
+        """Add one answer to a player's totals and move them to their new position."""
+        player = self._players.get(player_id)
+        if player is None:
+            player = self._players[player_id] = PlayerScore(player_id=player_id, username=username)
+        else:
+            self._keys.remove(self._sort_key(player))
+
+        player.total_answers += 1
+        if is_correct:
+            player.score += 1
+        if answer_time is not None:
+            player.answer_time_total += answer_time
+            player.timed_answers += 1
+
+        self._keys.add(self._sort_key(player))
+
+    def retract(self, player_id: int, is_correct: bool, answer_time: Optional[float]) -> None:
+        """Take back an answer added by :meth:`record`, e.g. one that could not be saved."""
+        player = self._players.get(player_id)
+        if player is None:
+            return
+        self._keys.remove(self._sort_key(player))
+
+        player.total_answers -= 1
+        if is_correct:
+            player.score -= 1
+        if answer_time is not None:
+            player.answer_time_total -= answer_time
+            player.timed_answers -= 1
+
+        if player.total_answers <= 0:
+            del self._players[player_id]
+        else:
+            self._keys.add(self._sort_key(player))
+
+    def top(self, limit: Optional[int] = None) -> List[PlayerScore]:
+        """Return the best ``limit`` players (all players if no limit is given)."""
+        keys = self._keys if limit is None else self._keys.islice(stop=limit)
+        return [self._players[player_id] for _, _, player_id in keys]
+
+    def get(self, player_id: int) -> Optional[PlayerScore]:
+        return self._players.get(player_id)
+
+    def rank(self, player_id: int) -> Optional[int]:
+        """Return a player's 1-based position, or None if they have not answered."""
+        player = self._players.get(player_id)
+        if player is None:
+            return None
+        return self._keys.bisect_left(self._sort_key(player)) + 1
+
+    @classmethod
+    def from_totals(cls, session_id: int, totals: Iterable[PlayerScore]) -> "SessionLeaderboard":
+        board = cls(session_id)
+        for player in totals:
+            board._players[player.player_id] = player
+        board._keys.update(cls._sort_key(player) for player in board._players.values())
+        return board
+
+
+class LeaderboardRegistry:
+    """Size-bounded LRU of the final leaderboards of finished sessions.
+
+    Boards of sessions still in play are not kept here: nothing would update
+    them once another worker moves the session on. Active sessions keep
+    theirs in the live engine.
+    """
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._boards: "OrderedDict[int, SessionLeaderboard]" = OrderedDict()
+
+    def get(self, session_id: int) -> Optional[SessionLeaderboard]:
+        board = self._boards.get(session_id)
+        if board is not None:
+            self._boards.move_to_end(session_id)
+        return board
+
+    def store(self, board: SessionLeaderboard) -> None:
+        self._boards[board.session_id] = board
+        self._boards.move_to_end(board.session_id)
+        while len(self._boards) > self.max_sessions:
+            self._boards.popitem(last=False)
+
+    async def rebuild(self, db: AsyncSession, session_id: int) -> SessionLeaderboard:
+        """Aggregate a session's persisted answers into a fresh leaderboard (not stored)."""
+        result = await db.execute(select(
+            User.id,
+            User.username,
+            func.sum(case((PlayerAnswer.is_correct == True, 1), else_=0)),
+            func.count(PlayerAnswer.id),
+            func.sum(PlayerAnswer.answer_time),
+            func.count(PlayerAnswer.answer_time)
+        ).join(
+            PlayerAnswer, User.id == PlayerAnswer.player_id
+        ).where(
+            PlayerAnswer.session_id == session_id
+        ).group_by(
+            User.id, User.username
+        ))
+        rows = result.all()
+
+        board = SessionLeaderboard.from_totals(session_id, (
+            PlayerScore(
+                player_id=player_id,
+                username=username,
+                score=score or 0,
+                total_answers=total_answers,
+                answer_time_total=answer_time_total or 0.0,
+                timed_answers=timed_answers
+            )
+            for player_id, username, score, total_answers, answer_time_total, timed_answers in rows
+        ))
+        return board
+
+
+leaderboards = LeaderboardRegistry(max_sessions=settings.leaderboard_cache_sessions)
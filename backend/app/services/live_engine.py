@@ -0,0 +1,299 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.quiz import Question, Option
+from app.models.session import GameSession, PlayerAnswer, SessionStatus
+from app.schemas.session import PacketOption, QuestionPacket
+from app.services.answer_buffer import AnswerBuffer, answer_buffer
+from app.services.leaderboard import SessionLeaderboard, leaderboards
+from app.services.scheduler import question_scheduler
+
+class AnswerRejected(Exception):
+    """Raised when an answer fails validation against a live session."""
+
+
+class QuestionNotOpen(AnswerRejected):
+    """Raised when an answer is for a question other than the open one."""
+
+
+def utc_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Convert a stored datetime to a POSIX timestamp; naive values are UTC (SQLite drops the offset)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class AcceptedAnswer:
+    """An answer the live engine took, as shared with other workers."""
+
+    player_id: int
+    username: str
+    question_id: int
+    is_correct: bool
+    answer_time: float
+
+
+@dataclass
+class LiveSession:
+    """In-memory state of an ACTIVE game session."""
+
+    session_id: int
+    quiz_id: int
+    question_ids: List[int]
+    # question_id -> option_id -> is_correct
+    options: Dict[int, Dict[int, bool]]
+    # Encoded player-facing QuestionPacket per question index
+    question_packets: List[bytes]
+    current_question_index: int
+    leaderboard: SessionLeaderboard
+    # Seconds players get per question, None or 0 for untimed sessions
+    question_time_limit: Optional[int] = None
+    # POSIX timestamp at which the current question opened
+    question_started_at: float = 0.0
+    # Index of the last question whose deadline has been handled
+    closed_question_index: int = -1
+    # (player_id, question_id) pairs that already have an answer
+    answered: Set[Tuple[int, int]] = field(default_factory=set)
+    # question_id -> number of answers received
+    answer_counts: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def question_deadline(self) -> Optional[float]:
+        """When the current question stops accepting answers, before the grace period."""
+        if not self.question_time_limit:
+            return None
+        return self.question_started_at + self.question_time_limit
+
+
+class LiveGameEngine:
+    """Serve the answer hot path of active sessions from memory.
+
+    When a session goes ACTIVE its questions, options and correctness map are
+    loaded once, so validating and de-duplicating an answer is a dictionary
+    lookup. Accepted answers are handed to an :class:`AnswerBuffer`, which
+    writes them to ``player_answers`` in group commits; an answer it fails to
+    write is taken back out of the in-memory state.
+
+    The server owns question timing: ``answer_time`` is measured from when
+    the question opened, and answers arriving more than ``answer_grace``
+    seconds after the deadline are refused. Deadlines are handed to the
+    question scheduler, which closes (and optionally advances) questions.
+    """
+
+    def __init__(self, answers: AnswerBuffer, answer_grace: float):
+        self.answers = answers
+        self.answer_grace = answer_grace
+        self._sessions: Dict[int, LiveSession] = {}
+
+    def start(self) -> None:
+        """Start writing queued answers in the background."""
+        self.answers.start()
+
+    async def stop(self) -> None:
+        """Stop the background writer and persist any queued answers."""
+        await self.answers.stop()
+
+    def get(self, session_id: int) -> Optional[LiveSession]:
+        """Return the live state of a session if it is loaded."""
+        return self._sessions.get(session_id)
+
+    async def load(self, db: AsyncSession, session: GameSession) -> LiveSession:
+        """Load an active session's quiz and existing answers into memory."""
+        result = await db.execute(select(Question.id, Question.text).where(
+            Question.quiz_id == session.quiz_id
+        ).order_by(Question.order, Question.id))
+        questions = result.all()
+        question_ids = [question_id for question_id, _ in questions]
+
+        options: Dict[int, Dict[int, bool]] = {question_id: {} for question_id in question_ids}
+        packet_options: Dict[int, List[PacketOption]] = {question_id: [] for question_id in question_ids}
+        option_rows = await db.execute(select(
+            Option.id, Option.question_id, Option.text, Option.order, Option.is_correct
+        ).join(
+            Question, Option.question_id == Question.id
+        ).where(
+            Question.quiz_id == session.quiz_id
+        ).order_by(Option.order, Option.id))
+        for option_id, question_id, text, order, is_correct in option_rows:
+            options[question_id][option_id] = bool(is_correct)
+            packet_options[question_id].append(PacketOption(id=option_id, text=text, order=order))
+
+        # Encode what players see of each question once, without correctness flags
+        question_packets = [
+            QuestionPacket(
+                session_id=session.id,
+                question_index=index,
+                total_questions=len(questions),
+                question_id=question_id,
+                text=text,
+                options=packet_options[question_id],
+                time_limit=session.question_time_limit
+            ).model_dump_json().encode()
+            for index, (question_id, text) in enumerate(questions)
+        ]
+
+        live = LiveSession(
+            session_id=session.id,
+            quiz_id=session.quiz_id,
+            question_ids=question_ids,
+            options=options,
+            question_packets=question_packets,
+            current_question_index=session.current_question_index,
+            leaderboard=await leaderboards.rebuild(db, session.id),
+            question_time_limit=session.question_time_limit
+        )
+
+        # Answers persisted before a restart still count towards dedup.
+        answer_rows = await db.execute(select(PlayerAnswer.player_id, PlayerAnswer.question_id).where(
+            PlayerAnswer.session_id == session.id
+        ))
+        for player_id, question_id in answer_rows:
+            live.answered.add((player_id, question_id))
+            live.answer_counts[question_id] = live.answer_counts.get(question_id, 0) + 1
+
+        # Another request may have loaded the session while this one awaited
+        existing = self._sessions.get(session.id)
+        if existing is not None:
+            return existing
+        self._sessions[session.id] = live
+        self.open_question(
+            live,
+            session.current_question_index,
+            utc_timestamp(session.current_question_started_at) or time.time()
+        )
+        return live
+
+    def open_question(self, live: LiveSession, question_index: int, started_at: float) -> None:
+        """Make ``question_index`` the one accepting answers and schedule its deadline."""
+        live.current_question_index = question_index
+        live.question_started_at = started_at
+        deadline = live.question_deadline
+        if deadline is not None:
+            question_scheduler.schedule(live.session_id, question_index, deadline + self.answer_grace)
+
+    async def unload(self, session_id: int) -> None:
+        """Write pending answers and drop a session that is no longer active."""
+        live = self._sessions.pop(session_id, None)
+        if live is not None:
+            # Keep serving the final standings from memory, the database may
+            # not have the last answers until the flush below completes.
+            leaderboards.store(live.leaderboard)
+            await self.answers.flush()
+
+    async def record_answer(
+        self,
+        live: LiveSession,
+        player_id: int,
+        username: str,
+        question_id: int,
+        selected_option_id: int
+    ) -> AcceptedAnswer:
+        """Validate an answer and queue it for persistence."""
+        now = time.time()
+        question_options = live.options.get(question_id)
+        if question_options is None:
+            raise AnswerRejected("Question not found in this quiz")
+
+        index = live.current_question_index
+        if index >= len(live.question_ids) or live.question_ids[index] != question_id:
+            raise QuestionNotOpen("This question is not open for answers")
+
+        deadline = live.question_deadline
+        if deadline is not None and now > deadline + self.answer_grace:
+            raise AnswerRejected("Time is up for this question")
+
+        is_correct = question_options.get(selected_option_id)
+        if is_correct is None:
+            raise AnswerRejected("Option not found for this question")
+
+        key = (player_id, question_id)
+        if key in live.answered:
+            raise AnswerRejected("You have already answered this question")
+
+        answer_time = round(max(0.0, now - live.question_started_at), 3)
+        if deadline is not None:
+            answer_time = min(answer_time, float(live.question_time_limit))
+
+        answer = AcceptedAnswer(player_id, username, question_id, is_correct, answer_time)
+        self.apply_answer(live, answer)
+
+        def rollback():
+            # The answer was not saved: let the player submit it again
+            live.answered.discard(key)
+            live.answer_counts[question_id] -= 1
+            live.leaderboard.retract(player_id, is_correct, answer_time)
+
+        await self.answers.put({
+            "session_id": live.session_id,
+            "player_id": player_id,
+            "question_id": question_id,
+            "selected_option_id": selected_option_id,
+            "is_correct": is_correct,
+            "answer_time": answer_time,
+            "answered_at": datetime.fromtimestamp(now, timezone.utc)
+        }, rollback)
+
+        return answer
+
+    def apply_answer(self, live: LiveSession, answer: AcceptedAnswer) -> bool:
+        """Count an accepted answer, unless it already was; returns whether it was new.
+
+        Used for answers taken here and for those other workers report.
+        """
+        key = (answer.player_id, answer.question_id)
+        if key in live.answered:
+            return False
+        live.answered.add(key)
+        live.answer_counts[answer.question_id] = live.answer_counts.get(answer.question_id, 0) + 1
+        live.leaderboard.record(answer.player_id, answer.username, answer.is_correct, answer.answer_time)
+        return True
+
+    async def sync_answer(self, db: AsyncSession, live: LiveSession, player_id: int, username: str, question_id: int) -> None:
+        """Count the stored answer of a player whose own copy lost to it.
+
+        Its answer_recorded event may have arrived while this worker's copy
+        was still counted, and been skipped then.
+        """
+        result = await db.execute(select(PlayerAnswer.is_correct, PlayerAnswer.answer_time).where(
+            PlayerAnswer.session_id == live.session_id,
+            PlayerAnswer.player_id == player_id,
+            PlayerAnswer.question_id == question_id
+        ))
+        row = result.first()
+        if row is not None:
+            self.apply_answer(live, AcceptedAnswer(player_id, username, question_id, row.is_correct, row.answer_time or 0.0))
+
+    async def sync_question(self, db: AsyncSession, live: LiveSession) -> bool:
+        """Catch up with a question another worker opened; returns whether there was one.
+
+        Workers normally learn of new questions from question_changed events;
+        this covers events lost while the backplane was down.
+        """
+        result = await db.execute(select(
+            GameSession.current_question_index, GameSession.current_question_started_at
+        ).where(
+            GameSession.id == live.session_id,
+            GameSession.status == SessionStatus.ACTIVE
+        ))
+        row = result.first()
+        if row is None or row.current_question_index <= live.current_question_index:
+            return False
+        self.open_question(
+            live,
+            row.current_question_index,
+            utc_timestamp(row.current_question_started_at) or time.time()
+        )
+        return True
+
+
+live_engine = LiveGameEngine(
+    answers=answer_buffer,
+    answer_grace=settings.answer_grace_ms / 1000
+)
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.models.quiz import Question
+from app.models.session import GameSession, SessionStatus
+from app.services.events import SessionEventManager, session_events
+from app.services.game_codes import game_codes
+from app.services.live_engine import AcceptedAnswer, live_engine, utc_timestamp
+
+
+def session_state(session: GameSession) -> dict:
+    """Build the event payload describing a session's progress."""
+    started_at = utc_timestamp(session.current_question_started_at)
+    deadline = None
+    if started_at is not None and session.question_time_limit and session.status == SessionStatus.ACTIVE:
+        deadline = datetime.fromtimestamp(started_at + session.question_time_limit, timezone.utc)
+
+    return {
+        "status": session.status,
+        "current_question_index": session.current_question_index,
+        "current_question_started_at": session.current_question_started_at,
+        "question_deadline": deadline,
+        "finished_at": session.finished_at,
+        "participant_count": session.participant_count,
+        "roster_version": session.roster_version
+    }
+
+
+async def session_finished(session: GameSession) -> None:
+    """Release what a session held while it was live and tell its players it is over."""
+    game_codes.release(session.game_code, session.id)
+    await live_engine.unload(session.id)
+    # Other workers free the code too, in case it was allocated there
+    await session_events.broadcast(session.id, "session_finished", {
+        **session_state(session),
+        "game_code": session.game_code
+    })
+
+
+async def advance_session(db: AsyncSession, session: GameSession) -> bool:
+    """Move a session to its next question, or finish it after the last one.
+
+    The update only applies if the session is still on the question it was
+    read on, so a host click racing the question timer (or two workers
+    timing the same session) advances it once. Returns whether this call
+    moved the session.
+    """
+    # Count the quiz's questions without loading them
+    total_questions = await db.scalar(select(func.count(Question.id)).where(
+        Question.quiz_id == session.quiz_id
+    ))
+
+    now = datetime.now(timezone.utc)
+    question_index = session.current_question_index
+    if question_index >= total_questions - 1:
+        # End the session if this was the last question
+        values = {"status": SessionStatus.FINISHED, "finished_at": now}
+    else:
+        values = {"current_question_index": question_index + 1, "current_question_started_at": now}
+
+    result = await db.execute(
+        update(GameSession).where(
+            GameSession.id == session.id,
+            GameSession.current_question_index == question_index,
+            GameSession.status != SessionStatus.FINISHED
+        ).values(**values)
+    )
+    await db.commit()
+    await db.refresh(session)
+
+    if result.rowcount == 0:
+        return False
+
+    if session.status == SessionStatus.FINISHED:
+        await session_finished(session)
+    else:
+        live = live_engine.get(session.id)
+        if live is not None:
+            live_engine.open_question(live, session.current_question_index, now.timestamp())
+        await session_events.broadcast(session.id, "question_changed", session_state(session))
+
+    return True
+
+
+async def finish_session(db: AsyncSession, session: GameSession) -> None:
+    """End a session immediately."""
+    session.status = SessionStatus.FINISHED
+    session.finished_at = datetime.now(timezone.utc)
+
+    await db.commit()
+    await db.refresh(session)
+
+    await session_finished(session)
+
+
+async def on_question_deadline(session_id: int, question_index: int) -> None:
+    """Close a question whose time is up and, if configured, move on to the next one."""
+    live = live_engine.get(session_id)
+    if live is None or live.current_question_index != question_index:
+        # The session moved on or finished before the deadline
+        return
+    if live.closed_question_index >= question_index or question_index >= len(live.question_ids):
+        return
+    live.closed_question_index = question_index
+
+    question_id = live.question_ids[question_index]
+    await session_events.broadcast(session_id, "question_closed", {
+        "question_index": question_index,
+        "question_id": question_id,
+        "answer_count": live.answer_counts.get(question_id, 0)
+    })
+
+    if not settings.auto_advance_questions:
+        return
+
+    async with AsyncSessionLocal() as db:
+        session = await db.get(GameSession, session_id)
+        if session is None or session.status != SessionStatus.ACTIVE:
+            return
+        if session.current_question_index != question_index:
+            return
+        await advance_session(db, session)
+
+
+# Other workers may hold the same session in memory (without the dispatcher,
+# any of them can serve its requests). These handlers run on every worker
+# when an event is published and apply the change to the local copy; on the
+# worker that made the change they find nothing left to do.
+
+async def on_question_changed(session_id: int, data: dict) -> None:
+    live = live_engine.get(session_id)
+    if live is not None and data["current_question_index"] > live.current_question_index:
+        started_at = datetime.fromisoformat(data["current_question_started_at"])
+        live_engine.open_question(live, data["current_question_index"], utc_timestamp(started_at))
+
+
+async def on_question_closed(session_id: int, data: dict) -> None:
+    # Another worker's timer got there first; don't announce it again
+    live = live_engine.get(session_id)
+    if live is not None:
+        live.closed_question_index = max(live.closed_question_index, data["question_index"])
+
+
+async def on_session_finished(session_id: int, data: dict) -> None:
+    game_codes.release(data["game_code"], session_id)
+    await live_engine.unload(session_id)
+
+
+async def on_answer_recorded(session_id: int, data: dict) -> None:
+    live = live_engine.get(session_id)
+    if live is not None:
+        live_engine.apply_answer(live, AcceptedAnswer(**data))
+
+
+def sync_live_sessions(events: SessionEventManager) -> None:
+    """Keep this worker's in-memory sessions in step with changes made by other workers."""
+    events.on("question_changed", on_question_changed)
+    events.on("question_closed", on_question_closed)
+    events.on("session_finished", on_session_finished)
+    events.on("answer_recorded", on_answer_recorded, internal=True)
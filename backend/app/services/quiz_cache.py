@@ -0,0 +1,64 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+
+
+@dataclass
+class CachedPayload:
+    """An encoded quiz response and the version of the quiz it was built from."""
+
+    version: str
+    etag: str
+    body: bytes
+
+
+class QuizPayloadCache:
+    """LRU cache of JSON-encoded quiz payloads, bounded by total body size.
+
+    Entries are keyed by quiz id and stamped with the quiz's version (its
+    ``updated_at``, or ``created_at`` if it was never updated), so a stale
+    entry is never served even if an invalidation is missed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[int, CachedPayload]" = OrderedDict()
+
+    def get(self, quiz_id: int, version: str) -> Optional[CachedPayload]:
+        entry = self._entries.get(quiz_id)
+        if entry is None:
+            return None
+        if entry.version != version:
+            self.invalidate(quiz_id)
+            return None
+        self._entries.move_to_end(quiz_id)
+        return entry
+
+    def put(self, quiz_id: int, version: str, body: bytes) -> CachedPayload:
+        entry = CachedPayload(
+            version=version,
+            etag='"%s"' % hashlib.sha1(body).hexdigest(),
+            body=body
+        )
+        # Payloads larger than the whole cache are served but not kept
+        if len(body) > self.max_bytes:
+            return entry
+
+        self.invalidate(quiz_id)
+        self._entries[quiz_id] = entry
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+        return entry
+
+    def invalidate(self, quiz_id: int) -> None:
+        entry = self._entries.pop(quiz_id, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+
+quiz_cache = QuizPayloadCache(max_bytes=settings.quiz_cache_max_bytes)
@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DeadlineHandler = Callable[[int, int], Awaitable[None]]
+
+
+class QuestionScheduler:
+    """Fire a callback when the open question of a session runs out of time.
+
+    Every deadline of every session in this process lives in one heap served
+    by a single task, which sleeps until the earliest deadline or until an
+    earlier one is scheduled. Entries are never removed: when a question is
+    advanced early its old entry simply fires and the handler sees that the
+    session has moved on. That keeps scheduling at O(log n) with no timer
+    task per session.
+
+    Deadlines are wall-clock timestamps (``time.time()``) so they line up
+    with ``current_question_started_at`` across restarts.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int, int]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._handler: Optional[DeadlineHandler] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def start(self, handler: DeadlineHandler) -> None:
+        """Start the scheduler task; ``handler(session_id, question_index)`` runs at each deadline."""
+        self._handler = handler
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler task and wait for handlers that are still running."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        # Deadlines are rebuilt from the database when sessions are loaded again
+        self._heap.clear()
+
+    def schedule(self, session_id: int, question_index: int, deadline: float) -> None:
+        """Call the handler for ``question_index`` of ``session_id`` at ``deadline``."""
+        entry = (deadline, next(self._sequence), session_id, question_index)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            _, _, session_id, question_index = heapq.heappop(self._heap)
+            # Handlers touch the database; don't let a slow one hold up other deadlines
+            task = asyncio.create_task(self._fire(session_id, question_index))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, session_id: int, question_index: int) -> None:
+        try:
+            await self._handler(session_id, question_index)
+        except Exception:
+            logger.exception(
+                "Question deadline handler failed for session %d question %d",
+                session_id, question_index
+            )
+
+
+question_scheduler = QuestionScheduler()
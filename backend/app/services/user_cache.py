@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from sqlalchemy import event, inspect
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.user import User
+
+user_cache_requests = metrics.counter(
+    "quizme_user_cache_requests_total",
+    "Authenticated user lookups, by cache result.",
+    ("result",)
+)
+
+
+class UserCache:
+    """Short-lived, size-bounded cache of authenticated users keyed by token subject.
+
+    Cached users are detached ORM instances: callers may read their columns
+    but must not lazy-load relationships or add them back to a session.
+    Flushing an update or delete of a user drops that user's entry, so a
+    deactivated account stops authenticating immediately in this process
+    and within ``ttl`` seconds everywhere else.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, username: str) -> Optional[User]:
+        entry = self._entries.get(username)
+        if entry is None:
+            user_cache_requests.inc(result="miss")
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[username]
+            user_cache_requests.inc(result="expired")
+            return None
+        self._entries.move_to_end(username)
+        user_cache_requests.inc(result="hit")
+        return user
+
+    def put(self, user: User) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        self._entries[user.username] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache(
+    ttl=settings.user_cache_ttl_seconds,
+    max_entries=settings.user_cache_max_entries
+)
+
+metrics.gauge(
+    "quizme_user_cache_entries",
+    "Users currently held in the authenticated user cache.",
+    callback=lambda: len(user_cache)
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.username)
+    # A rename leaves the old subject cached under its previous username
+    for username in inspect(target).attrs.username.history.deleted or ():
+        user_cache.invalidate(username)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Simulate how session routing spreads live game state over workers.
+
+Replays the request pattern of ``--games`` concurrent games (players fetch
+each question, answer it and poll the leaderboard; the host moves on; once
+a game is over every player fetches the final standings) against
+``--workers`` simulated workers, modelling the caches the app has:
+
+- Live sessions (LiveGameEngine): a worker loads a session from the
+  database the first time it serves it and keeps it, without eviction,
+  until the session finishes. Every worker holding a copy applies each
+  answer and question change published on the backplane to it.
+- Final leaderboards (LeaderboardRegistry): an LRU of ``--cache-sessions``
+  finished sessions per worker, like LEADERBOARD_CACHE_SESSIONS; a miss
+  rebuilds the board from the database.
+
+Requests are routed the way a plain load balancer would (random, round
+robin) and the way app/dispatcher.py does (consistent hashing of the
+session id, using the same HashRing and path parsing). For each it reports
+database loads (live sessions plus leaderboard rebuilds), how many workers
+end up holding each live session, and how many times backplane events are
+applied to those copies. It also reports how many sessions change owner
+when one worker is added, for the ring and for naive modulo hashing.
+
+Usage (from the backend directory):
+    python benchmarks/affinity.py [--workers 4] [--games 200] [--players 30] [--questions 10] [--cache-sessions 1000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from app.services.affinity import HashRing, routing_key_for_path, session_routing_key, stable_hash
+
+
+class Worker:
+    """A worker's live sessions and its LRU of finished sessions' leaderboards."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.live = set()
+        self.boards = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.loaded = set()
+
+    def serve(self, session_id, finished):
+        if not finished:
+            if session_id in self.live:
+                self.hits += 1
+                return
+            self.loads += 1
+            self.loaded.add(session_id)
+            self.live.add(session_id)
+            return
+        if session_id in self.boards:
+            self.boards.move_to_end(session_id)
+            self.hits += 1
+            return
+        self.loads += 1
+        self.boards[session_id] = True
+        if len(self.boards) > self.capacity:
+            self.boards.popitem(last=False)
+
+
+def request_stream(args, rng):
+    """Yield (path, session finished) of all games' requests, interleaved as they would arrive."""
+    first_id = 1000
+    for question in range(args.questions):
+        burst = []
+        for game in range(args.games):
+            session_id = first_id + game
+            for _ in range(args.players):
+                burst.append(f"/api/sessions/{session_id}/question")
+                burst.append(f"/api/sessions/{session_id}/answer")
+                burst.append(f"/api/sessions/{session_id}/leaderboard")
+        rng.shuffle(burst)
+        for path in burst:
+            yield path, False
+        for game in range(args.games):
+            yield f"/api/sessions/{first_id + game}/next-question", False
+    # The last next-question finished every game
+    results = [
+        f"/api/sessions/{first_id + game}/leaderboard"
+        for game in range(args.games)
+        for _ in range(args.players)
+    ]
+    rng.shuffle(results)
+    for path in results:
+        yield path, True
+
+
+def simulate(args, route):
+    """Return the workers after the replay and the number of event applications."""
+    rng = random.Random(args.seed)
+    workers = [Worker(args.cache_sessions) for _ in range(args.workers)]
+    finished = set()
+    applied = 0
+    for path, is_finished in request_stream(args, rng):
+        key = routing_key_for_path(path)
+        session_id = int(path.split("/")[3])
+        if is_finished and session_id not in finished:
+            # session_finished reaches every worker, which drops its copy
+            finished.add(session_id)
+            for worker in workers:
+                worker.live.discard(session_id)
+        workers[route(key, rng)].serve(session_id, is_finished)
+        if path.endswith(("/answer", "/next-question")):
+            # answer_recorded / question_changed, applied to every copy
+            applied += sum(session_id in worker.live for worker in workers)
+    return workers, applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=30)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument(
+        "--cache-sessions", type=int, default=1000,
+        help="finished sessions' leaderboards each worker keeps (LEADERBOARD_CACHE_SESSIONS)"
+    )
+    parser.add_argument("--replicas", type=int, default=100, help="hash ring points per worker")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nodes = [f"worker{i}" for i in range(args.workers)]
+    ring = HashRing(nodes, args.replicas)
+    index = {node: i for i, node in enumerate(nodes)}
+    counter = itertools.count()
+
+    strategies = {
+        "random": lambda key, rng: rng.randrange(args.workers),
+        "round robin": lambda key, rng: next(counter) % args.workers,
+        "consistent hash": lambda key, rng: index[ring.node_for(key)],
+    }
+
+    total = args.games * (args.questions * (args.players * 3 + 1) + args.players)
+    print(f"🎮 {args.games} games x {args.players} players x {args.questions} questions = {total} requests")
+    print(f"🖥️  {args.workers} workers, {args.cache_sessions} final leaderboards cached per worker\n")
+    print(f"  {'routing':<16} {'hit rate':>9} {'db loads':>9} {'copies/session':>15} {'events applied':>15}  loads per worker")
+    for name, route in strategies.items():
+        workers, applied = simulate(args, route)
+        hits = sum(worker.hits for worker in workers)
+        loads = sum(worker.loads for worker in workers)
+        # Each worker holding a live session keeps its own copy in step
+        copies = sum(len(worker.loaded) for worker in workers) / args.games
+        per_worker = " ".join(f"{worker.loads:>6}" for worker in workers)
+        print(f"  {name:<16} {hits / (hits + loads):>8.1%} {loads:>9} {copies:>15.2f} {applied:>15}  {per_worker}")
+
+    # Moving sessions between workers costs a load each; see how many
+    # move when the pool grows by one
+    keys = [session_routing_key(1000 + game) for game in range(args.games)]
+    grown = HashRing(nodes + [f"worker{args.workers}"], args.replicas)
+    ring_moved = sum(ring.node_for(key) != grown.node_for(key) for key in keys)
+    modulo_moved = sum(
+        stable_hash(key) % args.workers != stable_hash(key) % (args.workers + 1) for key in keys
+    )
+    print(f"\n➕ Adding worker {args.workers + 1}: sessions changing owner")
+    print(f"  consistent hash  {ring_moved / len(keys):>6.1%}  (ideal {1 / (args.workers + 1):.1%})")
+    print(f"  modulo hash      {modulo_moved / len(keys):>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Load test the API by playing many live games at once.
+
+Runs the app in-process (with its lifespan, so answers go through the group
+commit buffer and deadlines through the scheduler) against a throwaway
+SQLite database, or against ``--database-url`` (e.g. a local Postgres) if
+given. Users are seeded directly and handed tokens, so bcrypt stays out of
+the numbers (see login_throughput.py for that). Then ``--games`` games run
+concurrently, each with ``--players`` players:
+
+    host creates a quiz and a session, players join, host starts it, then
+    for every question: players fetch it, answer in a burst, poll the
+    leaderboard and session state; host moves to the next question.
+
+Latency percentiles and throughput are reported per endpoint. ``--save``
+writes them as JSON; ``--baseline`` compares the run with a saved one and
+exits with status 1 if any request failed or the p95 of any endpoint with
+at least ``--min-count`` requests regressed by more than ``--tolerance``,
+so it can gate a release.
+
+Usage (from the backend directory):
+    python benchmarks/live_games.py [--games 20] [--players 25] [--questions 5]
+        [--database-url postgresql://...] [--save results.json]
+        [--baseline results.json --tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Recorder:
+    """Collects request latencies by endpoint name."""
+
+    def __init__(self, client):
+        self.client = client
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, name, method, url, token, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(
+            method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs
+        )
+        self.latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            if self.errors[name] == 1:
+                print(f"  ⚠️  {name} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    def summary(self, elapsed):
+        return {
+            name: {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "p50_ms": round(percentile(values, 0.50), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "rps": round(len(values) / elapsed, 1)
+            }
+            for name, values in sorted(self.latencies.items())
+        }
+
+
+def quiz_payload(questions, options):
+    return {
+        "title": "Benchmark quiz",
+        "description": "Generated by benchmarks/live_games.py",
+        "questions": [
+            {
+                "text": f"Question {q}",
+                "order": q,
+                "options": [
+                    {"text": f"Option {o}", "is_correct": o == 0, "order": o}
+                    for o in range(options)
+                ]
+            }
+            for q in range(questions)
+        ]
+    }
+
+
+async def play_game(rec, host_token, player_tokens, args):
+    response = await rec.request("POST /quizzes", "POST", "/api/quizzes/", host_token,
+                                 json=quiz_payload(args.questions, args.options))
+    quiz_id = response.json()["id"]
+
+    response = await rec.request("POST /sessions/start/{quiz}", "POST", f"/api/sessions/start/{quiz_id}",
+                                 host_token, json={"quiz_id": quiz_id, "question_time_limit": 60})
+    session = response.json()
+    session_id = session["id"]
+
+    async def join(token):
+        response = await rec.request("POST /sessions/join", "POST", "/api/sessions/join", token,
+                                     json={"game_code": session["game_code"]})
+        return response.json()["player_token"]
+
+    tokens = await asyncio.gather(*(join(token) for token in player_tokens))
+    await rec.request("GET /sessions/{id}/roster", "GET", f"/api/sessions/{session_id}/roster",
+                      host_token)
+    await rec.request("POST /sessions/{id}/start", "POST", f"/api/sessions/{session_id}/start",
+                      host_token)
+
+    async def play_question(token):
+        response = await rec.request("GET /sessions/{id}/question", "GET",
+                                     f"/api/sessions/{session_id}/question", token)
+        packet = response.json()
+        await rec.request("POST /sessions/{id}/answer", "POST", f"/api/sessions/{session_id}/answer",
+                          token, json={
+                              "question_id": packet["question_id"],
+                              "selected_option_id": random.choice(packet["options"])["id"]
+                          })
+        for _ in range(args.polls):
+            await rec.request("GET /sessions/{id}/leaderboard", "GET",
+                              f"/api/sessions/{session_id}/leaderboard", token, params={"limit": 10})
+            await rec.request("GET /sessions/{id}/state", "GET", f"/api/sessions/{session_id}/state",
+                              token)
+
+    for _ in range(args.questions):
+        await asyncio.gather(*(play_question(token) for token in tokens))
+        await rec.request("POST /sessions/{id}/next-question", "POST",
+                          f"/api/sessions/{session_id}/next-question", host_token)
+
+    await rec.request("GET /sessions/{id}/leaderboard/me", "GET",
+                      f"/api/sessions/{session_id}/leaderboard/me", tokens[0])
+
+
+def seed_users(args):
+    """Insert hosts and players directly and mint their access tokens."""
+    from sqlalchemy import insert, select
+    from app.auth.auth import create_user_token
+    from app.db.database import engine
+    from app.models.user import User
+
+    # A per-run prefix keeps reruns against a persistent database apart
+    prefix = f"bench{uuid.uuid4().hex[:8]}"
+    names = [f"{prefix}_host{g}" for g in range(args.games)]
+    names += [f"{prefix}_g{g}_p{p}" for g in range(args.games) for p in range(args.players)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": name, "email": f"{name}@example.com", "hashed_password": "!"}
+            for name in names
+        ])
+        users = conn.execute(select(User.id, User.username).where(User.username.like(f"{prefix}_%"))).all()
+
+    tokens = {user.username: create_user_token(user) for user in users}
+    hosts = [tokens[f"{prefix}_host{g}"] for g in range(args.games)]
+    players = [
+        [tokens[f"{prefix}_g{g}_p{p}"] for p in range(args.players)]
+        for g in range(args.games)
+    ]
+    return hosts, players
+
+
+def compare(results, baseline, tolerance, min_delta_ms, min_count):
+    """Return a list of regressions of ``results`` against ``baseline``."""
+    failures = []
+    for name, current in results["endpoints"].items():
+        if current["errors"]:
+            failures.append(f"{name}: {current['errors']} failed requests")
+        before = baseline["endpoints"].get(name)
+        # A p95 over a handful of requests is mostly noise
+        if before is None or min(before["count"], current["count"]) < min_count:
+            continue
+        limit = max(before["p95_ms"] * (1 + tolerance), before["p95_ms"] + min_delta_ms)
+        if current["p95_ms"] > limit:
+            failures.append(
+                f"{name}: p95 {current['p95_ms']:.1f} ms > {limit:.1f} ms (baseline {before['p95_ms']:.1f} ms)"
+            )
+    return failures
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.db.migrations import upgrade_database
+
+    upgrade_database()
+    print(f"🌱 Seeding {args.games} hosts and {args.games * args.players} players...")
+    hosts, players = seed_users(args)
+
+    print(f"🎮 Playing {args.games} games x {args.players} players x {args.questions} questions")
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            rec = Recorder(client)
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                play_game(rec, hosts[g], players[g], args) for g in range(args.games)
+            ))
+            elapsed = time.perf_counter() - start
+
+    endpoints = rec.summary(elapsed)
+    total = sum(stats["count"] for stats in endpoints.values())
+    results = {
+        "config": {
+            "games": args.games, "players": args.players, "questions": args.questions,
+            "polls": args.polls, "database": "sqlite" if args.database_url is None else args.database_url.split(":")[0]
+        },
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 1),
+        "endpoints": endpoints
+    }
+
+    print("\n📋 Results:")
+    print(f"  {'endpoint':<36} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8}")
+    for name, stats in endpoints.items():
+        print(
+            f"  {name:<36} {stats['count']:>6} {stats['errors']:>4} {stats['p50_ms']:>6.1f}ms "
+            f"{stats['p95_ms']:>6.1f}ms {stats['p99_ms']:>6.1f}ms {stats['rps']:>8.1f}"
+        )
+    print(f"  {total} requests in {elapsed:.2f}s, {results['throughput_rps']:.1f} req/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=25)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--polls", type=int, default=1, help="leaderboard/state polls per player per question")
+    parser.add_argument("--database-url", help="database to run against instead of a throwaway SQLite file")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="ignore p95 growth smaller than this, to keep fast endpoints from flapping")
+    parser.add_argument("--min-count", type=int, default=50,
+                        help="only gate endpoints with at least this many requests in both runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # Settings are read at import time, so configure them before loading the app
+    path = None
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    else:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.pop("DATABASE_ASYNC_URL", None)
+    os.environ.pop("DATABASE_READ_URL", None)
+
+    results = asyncio.run(run(args))
+    if path is not None:
+        os.remove(path)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.tolerance, args.min_delta_ms, args.min_count)
+        if failures:
+            print("\n❌ Regressions against the baseline:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
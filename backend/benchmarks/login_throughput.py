@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput and event loop responsiveness under concurrency.
+
+Runs the app in-process against a throwaway SQLite database, fires
+``--logins`` concurrent POST /api/auth/login requests (at most
+``--concurrency`` in flight) and, at the same time, a heartbeat task that
+measures how late the event loop wakes it up. With ``--inline`` bcrypt runs
+directly on the event loop, as it did before hashing moved to a worker pool.
+
+Usage (from the backend directory):
+    python benchmarks/login_throughput.py [--logins 200] [--concurrency 40] [--rounds 12] [--workers 4] [--inline]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """Sleep in short steps and record how late each wake-up is."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run(args):
+    import httpx
+    from sqlalchemy import insert
+    from app.main import app
+    from app.db.database import engine
+    from app.models.user import User
+    from app.auth import auth
+    from app.auth.hashing import get_pwd_context, password_hasher
+    from app.db.migrations import upgrade_database
+
+    if args.inline:
+        class InlineHasher:
+            async def verify(self, password, hashed_password):
+                return get_pwd_context().verify(password, hashed_password)
+        auth.password_hasher = InlineHasher()
+
+    upgrade_database()
+    print(f"🌱 Creating {args.users} users (bcrypt rounds={args.rounds})...")
+    hashed = get_pwd_context().hash("password")
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": hashed}
+            for i in range(args.users)
+        ])
+
+    mode = "inline on the event loop" if args.inline else f"{args.workers} worker threads"
+    print(f"🔐 {args.logins} logins, {args.concurrency} concurrent, hashing {mode}")
+
+    latencies, statuses, lags = [], {}, []
+    limit = asyncio.Semaphore(args.concurrency)
+    stop = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i):
+            async with limit:
+                start = time.perf_counter()
+                response = await client.post("/api/auth/login", json={
+                    "email": f"user{i % args.users}@example.com", "password": "password"
+                })
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        ticker = asyncio.create_task(heartbeat(stop, 0.01, lags))
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await ticker
+
+    password_hasher.shutdown()
+
+    print("\n📋 Results:")
+    print(f"  status codes        {dict(sorted(statuses.items()))}")
+    print(f"  throughput          {args.logins / elapsed:.1f} logins/s ({elapsed:.2f}s total)")
+    print(f"  latency p50/p95/max {percentile(latencies, 0.5):.0f} / {percentile(latencies, 0.95):.0f} / {max(latencies):.0f} ms")
+    if lags:
+        print(f"  event loop lag      mean {statistics.mean(lags):.1f} ms, max {max(lags):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=64)
+    parser.add_argument("--inline", action="store_true", help="verify passwords on the event loop")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before loading the app
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.pop("DATABASE_ASYNC_URL", None)
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_QUEUE"] = str(args.queue)
+
+    asyncio.run(run(args))
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
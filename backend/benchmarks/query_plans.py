@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark the session hot-path queries with and without the composite indexes.
+
+Seeds a throwaway SQLite database with a large dataset, then prints the query
+plan and timing of each query before and after creating the indexes added in
+migrations b13f35514e82 and 0d6c4f8e2b19.
+
+Usage (from the backend directory):
+    python benchmarks/query_plans.py [--quizzes 2000] [--sessions 500] [--players 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from app.db.database import Base
+from app.models.user import User
+from app.models.quiz import Quiz, Question, Option
+from app.models.session import GameSession, SessionParticipant, PlayerAnswer, SessionStatus
+
+NEW_INDEXES = [
+    "uq_player_answers_session_player_question",
+    "uq_session_participants_session_user",
+    "ix_questions_quiz_id_order",
+    "ix_options_question_id",
+    "ix_quizzes_creator_id_is_active_created_at",
+    "ix_quizzes_is_active_created_at_id",
+]
+
+QUERIES = [
+    (
+        "duplicate answer check",
+        "SELECT id FROM player_answers WHERE session_id = :session_id AND player_id = :player_id AND question_id = :question_id",
+    ),
+    (
+        "leaderboard rebuild",
+        "SELECT player_id, SUM(CASE WHEN is_correct THEN 1 ELSE 0 END), COUNT(id), AVG(answer_time) "
+        "FROM player_answers WHERE session_id = :session_id GROUP BY player_id",
+    ),
+    (
+        "active participants",
+        "SELECT id, user_id FROM session_participants WHERE session_id = :session_id AND is_active = 1",
+    ),
+    (
+        "participant lookup",
+        "SELECT id FROM session_participants WHERE session_id = :session_id AND user_id = :player_id AND is_active = 1",
+    ),
+    (
+        "quiz questions in order",
+        'SELECT id, text FROM questions WHERE quiz_id = :quiz_id ORDER BY "order", id',
+    ),
+    (
+        "options of a quiz",
+        "SELECT options.id, options.is_correct FROM options JOIN questions ON options.question_id = questions.id "
+        "WHERE questions.quiz_id = :quiz_id",
+    ),
+    (
+        "my quizzes page",
+        "SELECT id FROM quizzes WHERE creator_id = :creator_id AND is_active = 1 "
+        "ORDER BY created_at DESC, id DESC LIMIT 51",
+    ),
+    (
+        "all quizzes page",
+        "SELECT id FROM quizzes WHERE is_active = 1 ORDER BY created_at DESC, id DESC LIMIT 51",
+    ),
+]
+
+
+def seed(engine, quizzes, questions_per_quiz, sessions, players):
+    """Fill the database with users, quizzes, sessions and answers."""
+    print(f"🌱 Seeding {quizzes} quizzes, {sessions} sessions x {players} players...")
+    rng = random.Random(42)
+    users = players + 50
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Quiz), [
+            {"id": i, "title": f"Quiz {i}", "creator_id": rng.randint(1, 50), "question_count": questions_per_quiz}
+            for i in range(1, quizzes + 1)
+        ])
+
+        question_rows, option_rows = [], []
+        correct = {}
+        for quiz_id in range(1, quizzes + 1):
+            for order in range(questions_per_quiz):
+                question_id = len(question_rows) + 1
+                question_rows.append({"id": question_id, "quiz_id": quiz_id, "text": "?", "order": order})
+                for option_order in range(4):
+                    option_id = len(option_rows) + 1
+                    option_rows.append({
+                        "id": option_id, "question_id": question_id, "text": "!",
+                        "is_correct": option_order == 0, "order": option_order
+                    })
+                    if option_order == 0:
+                        correct[question_id] = option_id
+        conn.execute(insert(Question), question_rows)
+        conn.execute(insert(Option), option_rows)
+
+        session_rows, participant_rows, answer_rows = [], [], []
+        for session_id in range(1, sessions + 1):
+            quiz_id = rng.randint(1, quizzes)
+            session_rows.append({
+                "id": session_id, "quiz_id": quiz_id, "host_id": 1,
+                "game_code": f"G{session_id:05d}", "status": SessionStatus.FINISHED
+            })
+            first_question = (quiz_id - 1) * questions_per_quiz + 1
+            for player_id in range(51, 51 + players):
+                participant_rows.append({"session_id": session_id, "user_id": player_id, "is_active": True})
+                for question_id in range(first_question, first_question + questions_per_quiz):
+                    answer_rows.append({
+                        "session_id": session_id, "player_id": player_id, "question_id": question_id,
+                        "selected_option_id": correct[question_id], "is_correct": rng.random() < 0.5,
+                        "answer_time": rng.randint(1, 30)
+                    })
+        conn.execute(insert(GameSession), session_rows)
+        conn.execute(insert(SessionParticipant), participant_rows)
+        conn.execute(insert(PlayerAnswer), answer_rows)
+
+    print(f"   {len(answer_rows)} answers, {len(participant_rows)} participants, {len(option_rows)} options")
+
+
+def run_queries(conn, params, repeat):
+    """Print the plan and average time of every benchmark query."""
+    results = {}
+    for name, sql in QUERIES:
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(text(sql), params).fetchall()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+        results[name] = elapsed_ms
+        print(f"\n  {name}: {elapsed_ms:.3f} ms")
+        for row in plan:
+            print(f"    {row[-1]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quizzes", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    indexes = {
+        index.name: index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name in NEW_INDEXES
+    }
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    seed(engine, args.quizzes, args.questions, args.sessions, args.players)
+    params = {
+        "session_id": args.sessions // 2,
+        "player_id": 60,
+        "question_id": 1,
+        "quiz_id": args.quizzes // 2,
+        "creator_id": 7,
+    }
+
+    with engine.connect() as conn:
+        print("\n📉 Without composite indexes:")
+        before = run_queries(conn, params, args.repeat)
+
+    print("\n🔧 Creating indexes...")
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            indexes[name].create(conn)
+        conn.execute(text("ANALYZE"))
+
+    with engine.connect() as conn:
+        print("\n📈 With composite indexes:")
+        after = run_queries(conn, params, args.repeat)
+
+    print("\n📋 Summary (ms per query):")
+    for name, _ in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"  {name:<26} {before[name]:>9.3f} -> {after[name]:>8.3f}  ({speedup:.0f}x)")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
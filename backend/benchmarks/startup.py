@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh worker takes to boot and serve its first request.
+
+Each run starts a new Python process (so nothing is cached in memory) that
+imports ``app.main``, runs the app lifespan and sends GET /health through
+the ASGI transport, timing each step. The database is migrated once up
+front, as a release step would do. For comparison, the time the old
+``create_all`` calls at import took against the same database is reported
+too.
+
+The median boot time (import + lifespan) is checked against ``--budget-ms``;
+the script exits with status 1 if it is over, so it can gate a release.
+
+Usage (from the backend directory):
+    python benchmarks/startup.py [--runs 5] [--budget-ms 2000] [--database-url postgresql://...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+
+def child():
+    """Boot the app once and print the timings of each step as JSON."""
+    import asyncio
+
+    timings = {}
+    start = time.perf_counter()
+    from app.main import app
+    timings["import_ms"] = (time.perf_counter() - start) * 1000
+
+    async def serve():
+        import httpx
+
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["lifespan_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get("/health")
+                response.raise_for_status()
+            timings["first_request_ms"] = (time.perf_counter() - start) * 1000
+
+    asyncio.run(serve())
+
+    # What every worker used to pay at import time
+    from app.db.database import Base, engine
+    start = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    timings["create_all_ms"] = (time.perf_counter() - start) * 1000
+
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000,
+                        help="maximum median import + lifespan time")
+    parser.add_argument("--database-url", help="database to boot against instead of a throwaway SQLite file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    path = None
+    env = dict(os.environ)
+    if args.database_url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        env["DATABASE_URL"] = f"sqlite:///{path}"
+    else:
+        env["DATABASE_URL"] = args.database_url
+    for name in ("DATABASE_ASYNC_URL", "DATABASE_READ_URL", "MIGRATE_ON_STARTUP", "PROFILING_ENABLED"):
+        env.pop(name, None)
+
+    print("🗄️  Migrating the database...")
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True
+    )
+
+    print(f"🚀 Booting {args.runs} fresh workers...")
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, os.path.realpath(__file__), "--child"],
+            cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    if path is not None:
+        os.remove(path)
+
+    print("\n📋 Results (median / max):")
+    for step in ("import_ms", "lifespan_ms", "first_request_ms"):
+        values = [run[step] for run in runs]
+        print(f"  {step[:-3]:<20} {statistics.median(values):8.1f} / {max(values):8.1f} ms")
+    boot = statistics.median(run["import_ms"] + run["lifespan_ms"] for run in runs)
+    print(f"  {'boot (import+start)':<20} {boot:8.1f} ms   budget {args.budget_ms:.0f} ms")
+    create_all = statistics.median(run["create_all_ms"] for run in runs)
+    print(f"  {'create_all (removed)':<20} {create_all:8.1f} ms   no longer paid at import")
+
+    if boot > args.budget_ms:
+        print(f"\n❌ Boot time {boot:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+    print("\n✅ Within the boot time budget")
+
+
+if __name__ == "__main__":
+    main()
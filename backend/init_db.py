@@ -28,14 +28,8 @@ def main():
     # Change to backend directory
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    # Create initial migration
-    if not run_command(
-        "alembic revision --autogenerate -m 'Initial migration'",
-        "Creating initial migration"
-    ):
-        sys.exit(1)
-    
-    # Run migrations
+    # Run migrations; the app no longer creates tables on startup
+    # (set MIGRATE_ON_STARTUP=true to have it run them instead)
     if not run_command(
         "alembic upgrade head",
         "Running migrations"
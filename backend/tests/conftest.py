@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway SQLite database before it is imported
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ["MIGRATE_ON_STARTUP"] = "true"
+for name in ("DATABASE_ASYNC_URL", "DATABASE_READ_URL", "BACKPLANE_URL", "PROFILING_ENABLED"):
+    os.environ.pop(name, None)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def signup(client):
+    """Create a user and return the Authorization header for them."""
+    def signup(username: str) -> dict:
+        response = client.post("/api/auth/signup", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "password"
+        })
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return signup
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.services.answer_buffer import AnswerBuffer, AnswerNotPersisted, DuplicateAnswer, answer_key
+
+
+def row(player_id, **extra):
+    return {"session_id": 1, "player_id": player_id, "question_id": 1, **extra}
+
+
+class FlakyBuffer(AnswerBuffer):
+    """Writes rows to a list, failing any transaction that contains a bad row.
+
+    Like the unique index, rows for a key already written are skipped.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(window=0.001, max_rows=100, ack_after_commit=True, **kwargs)
+        self.written = []
+        self.hang = False
+
+    async def _write(self, rows):
+        while self.hang:
+            await asyncio.sleep(0.01)
+        if any(row.get("bad") for row in rows):
+            raise RuntimeError("constraint violation")
+        written = {answer_key(row) for row in self.written}
+        inserted = set()
+        for row in rows:
+            if answer_key(row) not in written | inserted:
+                inserted.add(answer_key(row))
+                self.written.append(row)
+        return inserted
+
+
+def test_bad_row_fails_alone():
+    async def scenario():
+        buffer = FlakyBuffer(ack_timeout=1)
+        buffer.start()
+        rolled_back = []
+        results = await asyncio.gather(
+            buffer.put(row(1), lambda: rolled_back.append(1)),
+            buffer.put(row(2, bad=True), lambda: rolled_back.append(2)),
+            buffer.put(row(3), lambda: rolled_back.append(3)),
+            return_exceptions=True
+        )
+        # Later answers are not held up by the bad one
+        await buffer.put(row(4))
+        await buffer.stop()
+        return buffer, results, rolled_back
+
+    buffer, results, rolled_back = asyncio.run(scenario())
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], AnswerNotPersisted)
+    assert rolled_back == [2]
+    assert sorted(row["player_id"] for row in buffer.written) == [1, 3, 4]
+
+
+def test_wait_is_bounded_and_queued_answer_withdrawn():
+    async def scenario():
+        buffer = FlakyBuffer(ack_timeout=0.05)
+        buffer.start()
+        buffer.hang = True
+        rolled_back = []
+        # The first answer's commit hangs; the second is still queued behind it
+        first = asyncio.create_task(buffer.put(row(1), lambda: rolled_back.append(1)))
+        await asyncio.sleep(0.02)
+        with pytest.raises(AnswerNotPersisted):
+            await buffer.put(row(2), lambda: rolled_back.append(2))
+        with pytest.raises(AnswerNotPersisted):
+            await first
+        buffer.hang = False
+        await buffer.stop()
+        return buffer, rolled_back
+
+    buffer, rolled_back = asyncio.run(scenario())
+    # The withdrawn answer is rolled back and never written; the one whose
+    # commit was already running still lands
+    assert rolled_back == [2]
+    assert [row["player_id"] for row in buffer.written] == [1]
+
+
+def test_duplicate_row_is_rolled_back():
+    async def scenario():
+        buffer = FlakyBuffer(ack_timeout=1)
+        buffer.start()
+        rolled_back = []
+        # Another worker stored player 1's answer first
+        buffer.written.append(row(1, origin="elsewhere"))
+        results = await asyncio.gather(
+            buffer.put(row(1), lambda: rolled_back.append(1)),
+            buffer.put(row(2), lambda: rolled_back.append(2)),
+            return_exceptions=True
+        )
+        await buffer.stop()
+        return buffer, results, rolled_back
+
+    buffer, results, rolled_back = asyncio.run(scenario())
+    assert isinstance(results[0], DuplicateAnswer)
+    assert results[1] is None
+    assert rolled_back == [1]
+    assert [row.get("origin") for row in buffer.written] == ["elsewhere", None]
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.backplane import BackplaneError, RedisBackplane, RedisError, read_reply
+
+
+class FakeRedis:
+    """Just enough of a Redis server for the backplane: AUTH, SELECT, SUBSCRIBE and PUBLISH.
+
+    With ``stall`` set it reads commands but never answers them.
+    """
+
+    def __init__(self, password=None, stall=False):
+        self.password = password
+        self.stall = stall
+        self.commands = []
+        self.subscribers = set()
+        self.writers = set()
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self
+
+    def url(self, credentials="", db=""):
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://{credentials}127.0.0.1:{port}{db}"
+
+    def drop_connections(self):
+        for writer in list(self.writers):
+            writer.close()
+
+    def close(self):
+        self.drop_connections()
+        self.server.close()
+
+    async def handle(self, reader, writer):
+        self.writers.add(writer)
+        authenticated = self.password is None
+        try:
+            while True:
+                name, *args = [part.decode() for part in await read_reply(reader)]
+                self.commands.append([name.upper(), *args])
+                if self.stall:
+                    continue
+                if name.upper() == "AUTH":
+                    authenticated = args[-1] == self.password
+                    writer.write(b"+OK\r\n" if authenticated else b"-WRONGPASS invalid password\r\n")
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                elif name.upper() == "SELECT":
+                    writer.write(b"+OK\r\n")
+                elif name.upper() == "SUBSCRIBE":
+                    self.subscribers.add(writer)
+                    writer.write(b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n" % (len(args[0]), args[0].encode()))
+                elif name.upper() == "PUBLISH":
+                    channel, message = (arg.encode() for arg in args)
+                    for subscriber in self.subscribers:
+                        subscriber.write(b"*3\r\n$7\r\nmessage\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n" % (
+                            len(channel), channel, len(message), message
+                        ))
+                    writer.write(b":%d\r\n" % len(self.subscribers))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self.writers.discard(writer)
+            writer.close()
+
+
+async def wait_for_messages(received, count):
+    for _ in range(200):
+        if len(received) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_read_reply_parses_resp():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"+OK\r\n:3\r\n$5\r\nhello\r\n$-1\r\n*2\r\n$1\r\na\r\n:1\r\n-ERR unknown command\r\n")
+        reader.feed_eof()
+        replies = [await read_reply(reader) for _ in range(5)]
+        with pytest.raises(RedisError, match="ERR unknown command"):
+            await read_reply(reader)
+        with pytest.raises(ConnectionError):
+            await read_reply(reader)
+        return replies
+
+    assert asyncio.run(scenario()) == ["OK", 3, b"hello", None, [b"a", 1]]
+
+
+def test_publish_reaches_subscribers_after_auth_and_select():
+    async def scenario():
+        redis = await FakeRedis(password="s3cret").start()
+        backplane = RedisBackplane(redis.url(":s3cret@", "/2"))
+        received = []
+
+        async def handler(message):
+            received.append(message)
+
+        await backplane.start(handler)
+        await backplane.publish("1:question_changed:{}")
+        await wait_for_messages(received, 1)
+        await backplane.stop()
+        redis.close()
+        return redis, received
+
+    redis, received = asyncio.run(scenario())
+    assert received == ["1:question_changed:{}"]
+    # Both the publisher and the subscriber authenticate and pick the database
+    assert redis.commands.count(["AUTH", "s3cret"]) == 2
+    assert redis.commands.count(["SELECT", "2"]) == 2
+
+
+def test_error_reply_while_connecting_is_a_backplane_error():
+    async def scenario():
+        redis = await FakeRedis(password="s3cret").start()
+        backplane = RedisBackplane(redis.url(":wrong@"))
+        with pytest.raises(BackplaneError, match="WRONGPASS"):
+            await backplane.publish("1:answer_recorded:{}")
+        publisher = backplane._publisher
+        redis.close()
+        return publisher
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_publish_reconnects_after_redis_drops_the_connection():
+    async def scenario():
+        redis = await FakeRedis().start()
+        backplane = RedisBackplane(redis.url())
+        await backplane.publish("1:session_started:{}")
+        redis.drop_connections()
+        await asyncio.sleep(0.01)
+        await backplane.publish("1:question_changed:{}")
+        await backplane.stop()
+        redis.close()
+        return redis
+
+    redis = asyncio.run(scenario())
+    assert [command[0] for command in redis.commands] == ["PUBLISH", "PUBLISH"]
+
+
+def test_stalled_redis_fails_publishes_within_the_timeout():
+    async def scenario():
+        redis = await FakeRedis(stall=True).start()
+        backplane = RedisBackplane(redis.url(), connect_timeout=0.1)
+        start = time.monotonic()
+        # The second publish waits behind the first; it gives up in time too
+        results = await asyncio.gather(
+            backplane.publish("1:answer_recorded:{}"),
+            backplane.publish("1:answer_recorded:{}"),
+            return_exceptions=True
+        )
+        elapsed = time.monotonic() - start
+        publisher = backplane._publisher
+        redis.close()
+        return results, elapsed, publisher
+
+    results, elapsed, publisher = asyncio.run(scenario())
+    assert all(isinstance(result, BackplaneError) for result in results), results
+    assert elapsed < 1
+    assert publisher is None
@@ -0,0 +1,69 @@
+import gzip
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import dispatcher
+
+
+class Body(httpx.AsyncByteStream):
+    """A response body that arrives in chunks, as from a real connection."""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.fixture
+def proxy():
+    """The dispatcher in front of a fake worker that echoes what it received."""
+    received = []
+
+    async def worker(request: httpx.Request) -> httpx.Response:
+        # MockTransport has already read the streamed body
+        body = request.content
+        received.append((request, body))
+        return httpx.Response(200, headers=[
+            ("Set-Cookie", "a=1"),
+            ("Set-Cookie", "b=2"),
+            ("Content-Encoding", "gzip"),
+            ("Content-Type", "text/plain")
+        ], stream=Body(*(bytes([byte]) for byte in gzip.compress(b"hello " + body))))
+
+    with TestClient(dispatcher.app) as client:
+        dispatcher.app.state.client = httpx.AsyncClient(transport=httpx.MockTransport(worker))
+        yield client, received
+
+
+def test_proxy_keeps_repeated_headers_and_encoded_body(proxy):
+    client, received = proxy
+    response = client.post("/api/quizzes/import", content=b"body", headers={"Authorization": "Bearer x"})
+
+    assert response.status_code == 200
+    assert response.headers.get_list("set-cookie") == ["a=1", "b=2"]
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "hello body"
+    assert response.headers["x-quizme-node"] in dispatcher.ring.nodes
+
+    request, body = received[0]
+    assert body == b"body"
+    assert request.headers["authorization"] == "Bearer x"
+    assert request.headers["host"] != "testserver"
+
+
+def test_proxy_streams_request_body(proxy):
+    client, received = proxy
+
+    def chunks():
+        yield b'{"title": "a"}\n'
+        yield b'{"title": "b"}\n'
+
+    response = client.post("/api/quizzes/import", content=chunks())
+    assert response.status_code == 200
+    request, body = received[0]
+    assert body == b'{"title": "a"}\n{"title": "b"}\n'
+    assert request.headers.get("transfer-encoding") == "chunked"
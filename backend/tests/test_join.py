@@ -0,0 +1,26 @@
+from app.services.game_codes import game_codes
+
+QUIZ = {
+    "title": "Join",
+    "questions": [{"text": "q", "order": 0, "options": [{"text": "a", "is_correct": True, "order": 0}]}]
+}
+
+
+def test_join_falls_back_to_game_code_when_lookup_is_stale(client, signup):
+    host = signup("join_host")
+    player = signup("join_player")
+    quiz_id = client.post("/api/quizzes/", json=QUIZ, headers=host).json()["id"]
+
+    finished = client.post(f"/api/sessions/start/{quiz_id}", json={"quiz_id": quiz_id}, headers=host).json()
+    client.post(f"/api/sessions/{finished['id']}/end", headers=host)
+    live = client.post(f"/api/sessions/start/{quiz_id}", json={"quiz_id": quiz_id}, headers=host).json()
+
+    # This process still maps the code to the finished session, as when
+    # another worker finished it and handed the code to a new game
+    game_codes._live.pop(live["game_code"], None)
+    game_codes._live[live["game_code"]] = finished["id"]
+
+    response = client.post("/api/sessions/join", json={"game_code": live["game_code"]}, headers=player)
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == live["id"]
+    assert game_codes.lookup(live["game_code"]) != finished["id"]
@@ -0,0 +1,166 @@
+import sqlite3
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+from conftest import DATABASE_PATH
+from app.services.events import session_events
+from app.services.game_codes import game_codes
+from app.services.live_engine import AcceptedAnswer
+
+QUIZ = {
+    "title": "Sync",
+    "questions": [
+        {
+            "text": f"q{index}",
+            "order": index,
+            "options": [
+                {"text": "right", "is_correct": True, "order": 0},
+                {"text": "wrong", "is_correct": False, "order": 1}
+            ]
+        }
+        for index in range(3)
+    ]
+}
+
+
+def start_game(client, host, players):
+    quiz_id = client.post("/api/quizzes/", json=QUIZ, headers=host).json()["id"]
+    session = client.post(f"/api/sessions/start/{quiz_id}", json={"quiz_id": quiz_id}, headers=host).json()
+    for player in players:
+        response = client.post("/api/sessions/join", json={"game_code": session["game_code"]}, headers=player)
+        assert response.status_code == 200, response.text
+    assert client.post(f"/api/sessions/{session['id']}/start", headers=host).status_code == 200
+    return session["id"]
+
+
+def remote_event(client, session_id, event, data):
+    """Deliver an event as if another worker had published it on the backplane."""
+    client.portal.call(session_events.broadcast, session_id, event, data)
+
+
+def scores(client, session_id, headers):
+    entries = client.get(f"/api/sessions/{session_id}/leaderboard", headers=headers).json()["entries"]
+    return [(entry["username"], entry["score"], entry["total_answers"]) for entry in entries]
+
+
+def test_events_from_other_workers_update_live_state(client, signup):
+    host = signup("sync_host")
+    player = signup("sync_player")
+    session_id = start_game(client, host, [player])
+    question = client.get(f"/api/sessions/{session_id}/question", headers=player).json()
+    assert question["question_index"] == 0
+
+    # Another worker took an answer: it counts here too, once
+    user_id = client.get("/api/auth/me", headers=player).json()["id"]
+    answer = AcceptedAnswer(user_id, "sync_player", question["question_id"], True, 1.5)
+    remote_event(client, session_id, "answer_recorded", asdict(answer))
+    remote_event(client, session_id, "answer_recorded", asdict(answer))
+    assert scores(client, session_id, host) == [("sync_player", 1, 1)]
+    response = client.post(f"/api/sessions/{session_id}/answer", json={
+        "question_id": question["question_id"],
+        "selected_option_id": question["options"][0]["id"]
+    }, headers=player)
+    assert response.status_code == 400
+
+    # ...and moved the session on
+    remote_event(client, session_id, "question_changed", {
+        "current_question_index": 1,
+        "current_question_started_at": datetime.now(timezone.utc)
+    })
+    assert client.get(f"/api/sessions/{session_id}/question", headers=player).json()["question_index"] == 1
+
+
+def test_answer_checks_database_when_question_event_was_lost(client, signup):
+    host = signup("lost_host")
+    player = signup("lost_player")
+    session_id = start_game(client, host, [player])
+    assert client.get(f"/api/sessions/{session_id}/question", headers=player).json()["question_index"] == 0
+
+    # Another worker advanced the session but its question_changed never arrived
+    with sqlite3.connect(DATABASE_PATH) as connection:
+        connection.execute(
+            "UPDATE game_sessions SET current_question_index = 1 WHERE id = ?", (session_id,)
+        )
+        question_id, option_id = connection.execute(
+            "SELECT questions.id, options.id FROM questions"
+            " JOIN game_sessions ON game_sessions.quiz_id = questions.quiz_id"
+            " JOIN options ON options.question_id = questions.id"
+            " WHERE game_sessions.id = ? AND questions.\"order\" = 1 AND options.is_correct",
+            (session_id,)
+        ).fetchone()
+
+    response = client.post(f"/api/sessions/{session_id}/answer", json={
+        "question_id": question_id,
+        "selected_option_id": option_id
+    }, headers=player)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/sessions/{session_id}/question", headers=player).json()["question_index"] == 1
+
+
+def test_session_finished_elsewhere_releases_game_code(client, signup):
+    host = signup("release_host")
+    quiz_id = client.post("/api/quizzes/", json=QUIZ, headers=host).json()["id"]
+    session = client.post(f"/api/sessions/start/{quiz_id}", json={"quiz_id": quiz_id}, headers=host).json()
+    assert game_codes.lookup(session["game_code"]) == session["id"]
+
+    remote_event(client, session["id"], "session_finished", {
+        "status": "finished",
+        "game_code": session["game_code"]
+    })
+    assert game_codes.lookup(session["game_code"]) is None
+
+
+def test_answer_stored_by_another_worker_wins(client, signup):
+    host = signup("dup_host")
+    player = signup("dup_player")
+    session_id = start_game(client, host, [player])
+    question = client.get(f"/api/sessions/{session_id}/question", headers=player).json()
+    user_id = client.get("/api/auth/me", headers=player).json()["id"]
+    right, wrong = question["options"]
+
+    # Another worker accepted a correct answer, but its event has not arrived
+    with sqlite3.connect(DATABASE_PATH) as connection:
+        connection.execute(
+            "INSERT INTO player_answers (session_id, player_id, question_id, selected_option_id, is_correct, answer_time)"
+            " VALUES (?, ?, ?, ?, 1, 2.0)",
+            (session_id, user_id, question["question_id"], right["id"])
+        )
+
+    response = client.post(f"/api/sessions/{session_id}/answer", json={
+        "question_id": question["question_id"],
+        "selected_option_id": wrong["id"]
+    }, headers=player)
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "You have already answered this question"
+    # The stored answer counts, not the rejected one
+    assert scores(client, session_id, host) == [("dup_player", 1, 1)]
+
+
+def test_leaderboard_of_waiting_session_is_not_cached(client, signup):
+    host = signup("waiting_host")
+    player = signup("waiting_player")
+    quiz_id = client.post("/api/quizzes/", json=QUIZ, headers=host).json()["id"]
+    session = client.post(f"/api/sessions/start/{quiz_id}", json={"quiz_id": quiz_id}, headers=host).json()
+    client.post("/api/sessions/join", json={"game_code": session["game_code"]}, headers=player)
+    assert scores(client, session["id"], host) == []
+
+    # Another worker starts the game and stores an answer; nothing reaches
+    # this worker, which holds no live copy of the session
+    with sqlite3.connect(DATABASE_PATH) as connection:
+        connection.execute(
+            "UPDATE game_sessions SET status = 'ACTIVE', current_question_started_at = CURRENT_TIMESTAMP"
+            " WHERE id = ?", (session["id"],)
+        )
+        user_id = client.get("/api/auth/me", headers=player).json()["id"]
+        question_id, option_id = connection.execute(
+            "SELECT questions.id, options.id FROM questions JOIN options ON options.question_id = questions.id"
+            " WHERE questions.quiz_id = ? AND questions.\"order\" = 0 AND options.is_correct",
+            (quiz_id,)
+        ).fetchone()
+        connection.execute(
+            "INSERT INTO player_answers (session_id, player_id, question_id, selected_option_id, is_correct, answer_time)"
+            " VALUES (?, ?, ?, ?, 1, 1.0)",
+            (session["id"], user_id, question_id, option_id)
+        )
+
+    assert scores(client, session["id"], host) == [("waiting_player", 1, 1)]
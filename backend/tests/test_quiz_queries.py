@@ -0,0 +1,61 @@
+import pytest
+
+from app.db.database import count_queries
+from app.services.quiz_cache import quiz_cache
+
+
+def make_quiz(questions: int, options: int) -> dict:
+    return {
+        "title": f"{questions} questions",
+        "questions": [
+            {
+                "text": f"Question {i}",
+                "order": i,
+                "options": [
+                    {"text": f"Option {k}", "is_correct": k == 0, "order": k}
+                    for k in range(options)
+                ]
+            }
+            for i in range(questions)
+        ]
+    }
+
+
+@pytest.fixture(scope="module")
+def host(client, signup):
+    headers = signup("query_count_host")
+    # Warm the user cache so only the endpoint's own queries are counted
+    assert client.get("/api/quizzes/mine", headers=headers).status_code == 200
+    return headers
+
+
+@pytest.mark.parametrize("questions, options", [(1, 2), (5, 4), (20, 6)])
+def test_get_quiz_query_count(client, host, questions, options):
+    quiz = client.post("/api/quizzes/", json=make_quiz(questions, options), headers=host).json()
+    quiz_cache.invalidate(quiz["id"])
+
+    # Version check, then the quiz, its questions and their options
+    with count_queries() as counter:
+        response = client.get(f"/api/quizzes/{quiz['id']}", headers=host)
+    assert response.status_code == 200
+    assert len(response.json()["questions"]) == questions
+    assert counter.count == 4, counter.statements
+
+    # Cached payload: only the version check
+    with count_queries() as counter:
+        response = client.get(f"/api/quizzes/{quiz['id']}", headers=host)
+    assert response.status_code == 200
+    assert counter.count == 1, counter.statements
+
+
+@pytest.mark.parametrize("questions, options", [(1, 2), (5, 4), (20, 6)])
+def test_get_quiz_for_management_query_count(client, host, questions, options):
+    quiz = client.post("/api/quizzes/", json=make_quiz(questions, options), headers=host).json()
+
+    with count_queries() as counter:
+        response = client.get(f"/api/quizzes/{quiz['id']}/manage", headers=host)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["questions"]) == questions
+    assert all(len(question["options"]) == options for question in body["questions"])
+    assert counter.count == 3, counter.statements
@@ -0,0 +1,76 @@
+import json
+
+
+def test_players_do_not_see_answers(client, signup):
+    host = signup("answers_host")
+    player = signup("answers_player")
+    quiz = client.post("/api/quizzes/", json={
+        "title": "Capitals",
+        "questions": [{
+            "text": "Capital of France?",
+            "order": 0,
+            "options": [
+                {"text": "Paris", "is_correct": True, "order": 0},
+                {"text": "Lyon", "is_correct": False, "order": 1}
+            ]
+        }]
+    }, headers=host).json()
+
+    # Fetch twice so the cached payload is checked too
+    for _ in range(2):
+        response = client.get(f"/api/quizzes/{quiz['id']}", headers=player)
+        assert response.status_code == 200
+        options = response.json()["questions"][0]["options"]
+        assert [option["text"] for option in options] == ["Paris", "Lyon"]
+        assert all("is_correct" not in option for option in options)
+
+    response = client.get(f"/api/quizzes/{quiz['id']}/manage", headers=host)
+    assert [option["is_correct"] for option in response.json()["questions"][0]["options"]] == [True, False]
+
+
+def test_import_keeps_questions_and_options_with_their_quiz(client, signup):
+    host = signup("import_host")
+    quizzes = [
+        {
+            "title": f"quiz {quiz}",
+            "questions": [
+                {
+                    "text": f"quiz {quiz} question {question}",
+                    "order": question,
+                    "options": [
+                        {"text": f"{quiz}/{question}/{option}", "is_correct": option == question, "order": option}
+                        for option in range(3)
+                    ]
+                }
+                for question in range(quiz + 1)
+            ]
+        }
+        for quiz in range(3)
+    ]
+    body = "\n".join(json.dumps(quiz) for quiz in quizzes)
+    response = client.post("/api/quizzes/import", content=body, headers=host)
+    assert response.json()["imported"] == 3
+
+    for summary in client.get("/api/quizzes/mine", headers=host).json():
+        quiz = int(summary["title"].split()[1])
+        questions = client.get(f"/api/quizzes/{summary['id']}/manage", headers=host).json()["questions"]
+        assert [question["text"] for question in questions] == [
+            f"quiz {quiz} question {question}" for question in range(quiz + 1)
+        ]
+        for question in questions:
+            number = question["order"]
+            assert [(option["text"], option["is_correct"]) for option in question["options"]] == [
+                (f"{quiz}/{number}/{option}", option == number) for option in range(3)
+            ]
+
+
+def test_next_cursor_is_readable_cross_origin(client, signup):
+    host = signup("cursor_host")
+    for title in ("first", "second"):
+        client.post("/api/quizzes/", json={"title": title, "questions": []}, headers=host)
+
+    response = client.get("/api/quizzes/mine?limit=1", headers={
+        **host, "Origin": "https://quiz-buddy.onrender.com"
+    })
+    assert "X-Next-Cursor" in response.headers
+    assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()